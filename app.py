@@ -1,49 +1,150 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, g
+import click
 import os
 import signal
 import json
 import csv
-import requests
 import io
+import threading
+import time
+import metrics
 from encryption import MultiSubstitutionCipher
-from model_logic import RecruitmentAI
+from remote_cache import get_remote_cache
+from id_allocator import IDAllocator
+from record_store import JSONLRecordStore, EncryptedRecordStore
+from jobs import JobQueue
 
 app = Flask(__name__, static_folder='static', template_folder='templates')
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DATA_DIR = os.path.join(BASE_DIR, 'data')
+# Overridable so benchmarks / tests can run against a scratch directory
+DATA_DIR = os.environ.get('RECRUITMENT_DATA_DIR') or os.path.join(BASE_DIR, 'data')
 CSV_PATH = os.path.join(DATA_DIR, 'new_candidates.csv')
-JSON_DB_PATH = os.path.join(DATA_DIR, 'database.json')
-ENC_DB_PATH = os.path.join(DATA_DIR, 'encrypted_database.txt')
+JSON_DB_PATH = os.path.join(DATA_DIR, 'database.json') # legacy, migrated into JSONL_DB_PATH
+JSONL_DB_PATH = os.path.join(DATA_DIR, 'database.jsonl')
+ENC_DB_PATH = os.path.join(DATA_DIR, 'encrypted_database.txt') # legacy, migrated into ENC_FRAMES_PATH
+ENC_FRAMES_PATH = os.path.join(DATA_DIR, 'encrypted_database.frames')
+ID_COUNTER_PATH = os.path.join(DATA_DIR, 'id_counter.txt')
+MODEL_DIR = os.path.join(BASE_DIR, 'models')
+CANDIDATE_STORE_PATH = os.path.join(DATA_DIR, 'candidate_store')
+JOBS_DIR = os.path.join(DATA_DIR, 'jobs')
+# Threads per worker running the post-submit work (scoring)
+SUBMIT_WORKERS = int(os.environ.get('SUBMIT_WORKERS', '2'))
+# Processes used to (re)score the full pool; only pools of 50k+ rows per process are split
+SCORING_WORKERS = int(os.environ.get('SCORING_WORKERS', '1'))
+# Weights / keyword lists / level maps per role (see scoring_profiles.py)
+SCORING_PROFILES_PATH = os.environ.get('SCORING_PROFILES_PATH') or os.path.join(BASE_DIR, 'scoring_profiles.json')
+SCORING_PROFILE = os.environ.get('SCORING_PROFILE', 'default')
+# Scores / rank index / bias counts shared by all gunicorn workers (see shared_state.py); '' = per-worker only
+SHARED_STATE_PATH = os.environ.get('SHARED_STATE_PATH', os.path.join(DATA_DIR, 'scores.sqlite3'))
 GITHUB_CSV_URL = "https://raw.githubusercontent.com/allmore0/min_sesgos/main/candidatos.csv"
+# Seconds before the cached GitHub CSV is revalidated (conditional GET)
+REMOTE_CSV_TTL = int(os.environ.get('REMOTE_CSV_TTL', '300'))
+REMOTE_CSV_TIMEOUT = float(os.environ.get('REMOTE_CSV_TIMEOUT', '5'))
+
+CSV_HEADERS = ["ID","Años de experiencia","Nombre(s)","Apellido_Paterno","Apellido_Materno","Edad","Género","Título_Principal","Habilidades_Personales_1","Habilidades_Personales_2","Colonia","Deporte","Música","Pasatiempo","Lectura","Logro_Profesional","Universidad","Año_Graduación","Certificación_1","Certificación_2","Python_Porcentaje","R_Porcentaje","SQL_Porcentaje","Estadística_Avanzada_Porcentaje","Sueldo_mensual","Disponibilidad_contratación","Disponibilidad_de_viajar","Idioma_1","Nivel_idioma_1","Idioma_2","Nivel_idioma_2","Religión_ficticia","Afiliación_política_ficticia","Nivel_Socio_Económico(NSE_AMAI)","Etnia_(Autodefinición)"]
 
 cipher = MultiSubstitutionCipher()
+job_queue = JobQueue(JOBS_DIR, max_workers=SUBMIT_WORKERS)
+remote_csv = get_remote_cache(GITHUB_CSV_URL, DATA_DIR, ttl=REMOTE_CSV_TTL, timeout=REMOTE_CSV_TIMEOUT)
 
-def get_next_id():
+# Heavy objects (pandas / NumPy / TensorFlow behind them) are created on first
+# use so a worker can serve `/` right after boot. See benchmarks/bench_startup.py.
+_singletons = {}
+_singletons_lock = threading.RLock() # factories may build other singletons (engine -> store)
+
+def _singleton(name, factory):
+    obj = _singletons.get(name)
+    if obj is None:
+        with _singletons_lock:
+            obj = _singletons.get(name)
+            if obj is None:
+                obj = _singletons[name] = factory()
+    return obj
+
+def get_candidate_store():
+    # Columnar copy of new_candidates.csv; built from the CSV the first time
+    def factory():
+        from candidate_store import ColumnarCandidateStore
+        store = ColumnarCandidateStore(CANDIDATE_STORE_PATH, CSV_HEADERS)
+        store.bootstrap_from_csv(CSV_PATH)
+        return store
+    return _singleton('candidate_store', factory)
+
+def get_record_store():
+    # Indexes (or migrates) the whole JSONL database: once per worker, on first write
+    return _singleton('record_store', lambda: JSONLRecordStore(JSONL_DB_PATH, legacy_json_path=JSON_DB_PATH))
+
+def get_encrypted_store():
+    def factory():
+        return EncryptedRecordStore(ENC_FRAMES_PATH, cipher, legacy_path=ENC_DB_PATH, seed=get_record_store().iter_records)
+    return _singleton('encrypted_store', factory)
+
+def get_scoring_profiles():
+    def factory():
+        from model_logic import load_scoring_profiles
+        return load_scoring_profiles(SCORING_PROFILES_PATH)
+    return _singleton('scoring_profiles', factory)
+
+def get_shared_state():
+    def factory():
+        from shared_state import SharedScoreState
+        return SharedScoreState(SHARED_STATE_PATH)
+    return _singleton('shared_state', factory) if SHARED_STATE_PATH else None
+
+def get_engine():
+    # Scores live in memory for the lifetime of the worker (see ScoringEngine),
+    # kept in step with the other workers through the shared state
+    def factory():
+        from model_logic import ScoringEngine
+        profile = get_scoring_profiles()[SCORING_PROFILE]
+        return ScoringEngine(CSV_PATH, remote_cache=remote_csv, store=get_candidate_store(),
+                             workers=SCORING_WORKERS, profile=profile, shared=get_shared_state())
+    return _singleton('engine', factory)
+
+def get_training_job():
+    # The availability CNN is trained out of process and hot-swapped from MODEL_DIR
+    def factory():
+        from training import TrainingJob
+        return TrainingJob(CSV_PATH, remote_url=GITHUB_CSV_URL, model_dir=MODEL_DIR)
+    return _singleton('training_job', factory)
+
+def get_model_registry():
+    def factory():
+        from training import ModelRegistry
+        return ModelRegistry(MODEL_DIR)
+    return _singleton('model_registry', factory)
+
+_remote_max_id = (None, None) # (remote_csv.version, max ID in that body)
+
+def remote_max_id():
+    """
+    Max numeric DS ID in the remote CSV, or None if it was never fetched.
+    Re-read only when remote_csv.version changes (the engine revalidates it).
+    """
+    global _remote_max_id
+    current = remote_csv.version # read first: a newer body is only parsed again
+    text = remote_csv.cached_text()
+    if text is None:
+        # Never fetched: try now (a failure is not retried before the TTL)
+        text = remote_csv.get_text()
+        if text is None:
+            return None
+        current = remote_csv.version
+    version, max_id = _remote_max_id
+    if version != current:
+        max_id = 0
+        for row in csv.reader(io.StringIO(text)):
+            if row and row[0].startswith('DS'):
+                try:
+                    max_id = max(max_id, int(row[0].replace("DS", "")))
+                except ValueError: pass
+        _remote_max_id = (current, max_id)
+    return max_id
+
+def scan_max_id():
+    """Max numeric DS ID in the local CSV. Only used to seed the counter (the remote is its floor)."""
     max_id = 0
-    
-    # Check Remote
-    try:
-        url = GITHUB_CSV_URL
-        r = requests.get(url)
-        if r.status_code != 200:
-            url = GITHUB_CSV_URL.replace('main', 'master')
-            r = requests.get(url)
-        
-        if r.status_code == 200:
-            lines = r.text.strip().splitlines()
-            if len(lines) > 1:
-                # Skip header, iterate to find max (assuming strict order is not guaranteed)
-                # Or just check last if ordered. Checking last is safer for speed.
-                last_line = lines[-1]
-                parts = last_line.split(',')
-                if parts and parts[0].startswith('DS'):
-                     try:
-                        uid = int(parts[0].replace("DS", ""))
-                        if uid > max_id: max_id = uid
-                     except: pass
-    except:
-        pass
 
     # Check Local
     if os.path.exists(CSV_PATH):
@@ -60,113 +161,366 @@ def get_next_id():
                             except: pass
         except: pass
         
-    return f"DS{max_id + 1:02d}"
+    return max_id
+
+id_allocator = IDAllocator(ID_COUNTER_PATH, seed=scan_max_id, floor=remote_max_id)
+
+def get_next_id():
+    with metrics.stage('id_allocate'):
+        return id_allocator.allocate()
+
+def profiling_requested():
+    # ?profile=1 or `X-Profile: 1` returns a stage breakdown with the response
+    flag = request.args.get('profile') or request.headers.get('X-Profile') or ''
+    return flag.lower() in ('1', 'true', 'yes')
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    start = getattr(g, 'request_start', None)
+    if start is not None:
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        metrics.observe('http_request_seconds', time.perf_counter() - start, endpoint=endpoint, method=request.method)
+        metrics.inc('http_requests_total', endpoint=endpoint, method=request.method, status=str(response.status_code))
+    return response
 
 @app.route('/')
 def index():
     return streamlit_template('index.html')
 
+def candidate_to_row(data, new_id):
+    """Maps a JSON form submission to a new_candidates.csv row."""
+    dp = data.get('datos_personales', {})
+    dl = data.get('datos_laborales_y_habilidades', {})
+    pc = data.get('porcentajes_conocimiento', {})
+    
+    # Default fillers for missing fields
+    return [
+        new_id,
+        dl.get('años_experiencia', 0),
+        dp.get('nombre', ''),
+        dp.get('apellido_paterno', ''),
+        dp.get('apellido_materno', ''),
+        dp.get('edad', 0),
+        dp.get('genero', ''),
+        dl.get('titulo_profesional', ''),
+        dl.get('habilidades', [{}])[0].get('nombre', '') if dl.get('habilidades') else '',
+        dl.get('habilidades', [{}, {}])[1].get('nombre', '') if len(dl.get('habilidades', [])) > 1 else '',
+        "Online", # Colonia
+        "", # Deporte
+        "", # Musica
+        "", # Pasatiempo
+        "", # Lectura
+        "", # Logro
+        "Online Univ", # Universidad
+        "2024", # Año
+        dl.get('certificaciones', [''])[0] if dl.get('certificaciones') else '',
+        dl.get('certificaciones', ['', ''])[1] if len(dl.get('certificaciones', [])) > 1 else '',
+        float(pc.get('python', 0)) / 100.0,
+        float(pc.get('r', 0)) / 100.0,
+        float(pc.get('sql', 0)) / 100.0,
+        float(pc.get('estadistica_avanzada', 0)) / 100.0,
+        30000, # Sueldo Default
+        "Inmediata ", # Disp Contratacion
+        "No reubicación", # Viaje
+        dl.get('idioma', ''),
+        dl.get('nivel_idioma', ''),
+        "", "", # Idioma 2
+        dp.get('religion', ''),
+        dp.get('preferencia_politica', ''),
+        "C", # NSE
+        dp.get('raza', '')
+    ]
+
+def csv_record_to_row(record, new_id):
+    """Maps a row of an uploaded CSV (candidatos.csv schema) to a new row; its ID is replaced."""
+    return [new_id] + [record.get(col) or '' for col in CSV_HEADERS[1:]]
+
+def append_csv_rows(rows):
+    # Ensure headers exist if new (or blank) file
+    write_header = not os.path.exists(CSV_PATH)
+    if not write_header and os.path.getsize(CSV_PATH) < 16:
+        with open(CSV_PATH, 'r', encoding='utf-8') as f:
+            write_header = not f.read().strip()
+    mode = 'w' if write_header else 'a'
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    if write_header:
+        writer.writerow(CSV_HEADERS)
+    writer.writerows(rows)
+    payload = buf.getvalue()
+    with open(CSV_PATH, mode, newline='', encoding='utf-8') as f:
+        f.write(payload)
+    metrics.inc('bytes_written_total', len(payload.encode('utf-8')), target='csv')
+
+def persist_candidates(records, rows):
+    """Steps 4-6: CSV + columnar store, JSONL record store and encrypted store, one write each."""
+    store = get_candidate_store() # bootstrapped from the CSV *before* we append to it
+    # Likewise seeded from the JSONL store: it must exist before these records are in it
+    encrypted_store = get_encrypted_store()
+    with metrics.stage('csv_append'):
+        append_csv_rows(rows)
+    with metrics.stage('candidate_store_append'):
+        store.append_rows(rows)
+    with metrics.stage('jsonl_append'):
+        get_record_store().append_many(records)
+    encrypted_store.append_many(records)
+
+def predict_availability(rows):
+    # Only if a trained model has been published
+    try:
+        with metrics.stage('predict'):
+            return get_model_registry().predict_availability([dict(zip(CSV_HEADERS, row)) for row in rows])
+    except Exception as e:
+        print(f"Warning: availability model unavailable: {e}")
+        return None
+
+def ingest_batch(items):
+    """
+    Bulk pipeline shared by /submit_batch and `flask import-candidates`.
+    `items` is a list of (record, to_row) where to_row(new_id) builds the CSV row.
+    IDs are allocated as one block, each store is written once and scoring +
+    bias analysis run once for the whole batch.
+    """
+    ids = id_allocator.allocate_block(len(items))
+    records, rows = [], []
+    for new_id, (record, to_row) in zip(ids, items):
+        record_with_id = dict(record)
+        record_with_id['id'] = new_id
+        records.append(record_with_id)
+        rows.append(to_row(new_id))
+    persist_candidates(records, rows)
+
+    engine = get_engine()
+    engine.add_candidates([dict(zip(CSV_HEADERS, row)) for row in rows])
+    with metrics.stage('rank'):
+        results = engine.results_for_many(ids)
+
+    predicted = predict_availability(rows)
+    if predicted is not None and 'candidates' in results:
+        for cand, value in zip(results['candidates'], predicted):
+            cand['predicted_availability'] = value
+    return results
+
+def load_batch_file(stream, filename):
+    """Batch items from an uploaded / local .csv (candidatos.csv schema) or .json list."""
+    text = stream.read()
+    if isinstance(text, bytes):
+        text = text.decode('utf-8-sig')
+    if filename.lower().endswith('.json'):
+        payload = json.loads(text)
+        candidates = payload.get('candidates', []) if isinstance(payload, dict) else payload
+        return [(c, lambda new_id, c=c: candidate_to_row(c, new_id)) for c in candidates]
+    items = []
+    for rec in csv.DictReader(io.StringIO(text)):
+        rec = {k: v for k, v in rec.items() if k in CSV_HEADERS and k != 'ID'}
+        items.append((rec, lambda new_id, rec=rec: csv_record_to_row(rec, new_id)))
+    return items
+
+def process_submission(record_with_id, row, profile=False):
+    """Downstream work of /submit, run by the job queue (steps 7-8)."""
+    new_id = record_with_id['id']
+
+    with metrics.profiling(profile) as stages:
+        # 7. Run AI Model (only the new row is scored, the rest is cached)
+        engine = get_engine()
+        engine.add_candidate(dict(zip(CSV_HEADERS, row)))
+        with metrics.stage('rank'):
+            results = engine.results_for(new_id)
+
+        # 8. Availability prediction
+        predicted = predict_availability([row])
+        if predicted is not None:
+            results['current_candidate']['predicted_availability'] = predicted[0]
+
+    response = {
+        "status": "success",
+        "id": new_id,
+        "results": results,
+        "is_best": results['current_candidate']['is_best']
+    }
+    if stages is not None:
+        response["profile"] = stages
+    return response
+
 @app.route('/submit', methods=['POST'])
 def submit():
+    """
+    Persists the candidate and returns at once (202) with a job ID; the score
+    and rank are available from /jobs/<job_id> when the job finishes.
+    """
     try:
         data = request.json
-        # 1. Generate ID
-        new_id = get_next_id()
-        
-        # 2. Extract Data from JSON Form
-        dp = data.get('datos_personales', {})
-        dl = data.get('datos_laborales_y_habilidades', {})
-        pc = data.get('porcentajes_conocimiento', {})
-        
-        # 3. Map to CSV Format
-        # Default fillers for missing fields
-        row = [
-            new_id,
-            dl.get('años_experiencia', 0),
-            dp.get('nombre', ''),
-            dp.get('apellido_paterno', ''),
-            dp.get('apellido_materno', ''),
-            dp.get('edad', 0),
-            dp.get('genero', ''),
-            dl.get('titulo_profesional', ''),
-            dl.get('habilidades', [{}])[0].get('nombre', '') if dl.get('habilidades') else '',
-            dl.get('habilidades', [{}, {}])[1].get('nombre', '') if len(dl.get('habilidades', [])) > 1 else '',
-            "Online", # Colonia
-            "", # Deporte
-            "", # Musica
-            "", # Pasatiempo
-            "", # Lectura
-            "", # Logro
-            "Online Univ", # Universidad
-            "2024", # Año
-            dl.get('certificaciones', [''])[0] if dl.get('certificaciones') else '',
-            dl.get('certificaciones', ['', ''])[1] if len(dl.get('certificaciones', [])) > 1 else '',
-            float(pc.get('python', 0)) / 100.0,
-            float(pc.get('r', 0)) / 100.0,
-            float(pc.get('sql', 0)) / 100.0,
-            float(pc.get('estadistica_avanzada', 0)) / 100.0,
-            30000, # Sueldo Default
-            "Inmediata ", # Disp Contratacion
-            "No reubicación", # Viaje
-            dl.get('idioma', ''),
-            dl.get('nivel_idioma', ''),
-            "", "", # Idioma 2
-            dp.get('religion', ''),
-            dp.get('preferencia_politica', ''),
-            "C", # NSE
-            dp.get('raza', '')
-        ]
-        
-        # 4. Append to CSV
-        # Ensure headers exist if new file
-        if not os.path.exists(CSV_PATH):
-            headers = ["ID","Años de experiencia","Nombre(s)","Apellido_Paterno","Apellido_Materno","Edad","Género","Título_Principal","Habilidades_Personales_1","Habilidades_Personales_2","Colonia","Deporte","Música","Pasatiempo","Lectura","Logro_Profesional","Universidad","Año_Graduación","Certificación_1","Certificación_2","Python_Porcentaje","R_Porcentaje","SQL_Porcentaje","Estadística_Avanzada_Porcentaje","Sueldo_mensual","Disponibilidad_contratación","Disponibilidad_de_viajar","Idioma_1","Nivel_idioma_1","Idioma_2","Nivel_idioma_2","Religión_ficticia","Afiliación_política_ficticia","Nivel_Socio_Económico(NSE_AMAI)","Etnia_(Autodefinición)"]
-            with open(CSV_PATH, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(headers)
-
-        with open(CSV_PATH, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(row)
-            
-        # 5. Append to JSON DB
-        db_data = []
-        if os.path.exists(JSON_DB_PATH):
-            try:
-                with open(JSON_DB_PATH, 'r') as f:
-                    content = f.read().strip()
-                    if content:
-                        db_data = json.loads(content)
-            except:
-                pass
-        
-        record_with_id = data.copy()
-        record_with_id['id'] = new_id
-        db_data.append(record_with_id)
-        
-        with open(JSON_DB_PATH, 'w', encoding='utf-8') as f:
-            json.dump(db_data, f, indent=2)
-            
-        # 6. Encrypt
-        encrypted_content = cipher.encrypt(json.dumps(db_data))
-        with open(ENC_DB_PATH, 'w', encoding='utf-8') as f:
-            f.write(encrypted_content)
-            
-        # 7. Run AI Model
-        model = RecruitmentAI(CSV_PATH, remote_url=GITHUB_CSV_URL)
-        results = model.run_analysis(new_id)
+        profile = profiling_requested()
+        with metrics.profiling(profile) as stages:
+            # 1. Generate ID
+            new_id = get_next_id()
+
+            # 2-3. Extract Data from JSON Form and map to CSV Format
+            row = candidate_to_row(data, new_id)
+
+            # 4-6. CSV + columnar store, JSON DB and encrypted DB (local appends
+            # only). Encrypting one record is cheap, and done here it survives a
+            # worker restart that loses the in-memory job queue.
+            record_with_id = data.copy()
+            record_with_id['id'] = new_id
+            persist_candidates([record_with_id], [row])
+
+        # 7-8. Analysis happens in the background
+        # (the job result carries its own profile)
+        job_id = job_queue.submit(process_submission, record_with_id, row, profile=profile)
         
-        return jsonify({
-            "status": "success",
+        response = {
+            "status": "accepted",
             "id": new_id,
-            "results": results,
-            "is_best": results['current_candidate']['is_best']
-        })
+            "job_id": job_id,
+            "status_url": f"/jobs/{job_id}"
+        }
+        if stages is not None:
+            response["profile"] = stages
+        return jsonify(response), 202
         
     except Exception as e:
         print(f"Error: {e}")
         return jsonify({"status": "error", "message": str(e)}), 500
 
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": f"Unknown job {job_id}"}), 404
+    return jsonify(job)
+
+@app.route('/submit_batch', methods=['POST'])
+def submit_batch():
+    """
+    Accepts a JSON list of candidates (same shape as /submit, or
+    {"candidates": [...]}) or a multipart upload `file` (.csv / .json).
+    """
+    try:
+        if 'file' in request.files:
+            upload = request.files['file']
+            items = load_batch_file(upload.stream, upload.filename or 'upload.csv')
+        else:
+            payload = request.get_json(silent=True) # None: no (or invalid) JSON body
+            candidates = payload.get('candidates') if isinstance(payload, dict) else payload
+            if not isinstance(candidates, list):
+                candidates = []
+            items = [(c, lambda new_id, c=c: candidate_to_row(c, new_id)) for c in candidates]
+        if not items:
+            return jsonify({"status": "error", "message": "No candidates in request."}), 400
+
+        with metrics.profiling(profiling_requested()) as stages:
+            results = ingest_batch(items)
+        response = {
+            "status": "success",
+            "ids": [c['id'] for c in results.get('candidates', [])],
+            "results": results
+        }
+        if stages is not None:
+            response["profile"] = stages
+        return jsonify(response)
+
+    except Exception as e:
+        print(f"Error: {e}")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.cli.command('import-candidates')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+def import_candidates(path):
+    """Bulk-imports a .csv (candidatos.csv schema) or .json list of candidates."""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        items = load_batch_file(f, path)
+    if not items:
+        raise click.ClickException("No candidates found in file.")
+    results = ingest_batch(items)
+    click.echo(json.dumps(results, ensure_ascii=False, indent=2))
+
+@app.cli.command('compare-profiles')
+@click.argument('names', nargs=-1, required=True)
+@click.option('--candidate', default=None, help="Candidate ID to report score / rank for.")
+def compare_profiles(names, candidate):
+    """A/B: runs the analysis once per scoring profile (features are parsed once per feature set)."""
+    from model_logic import RecruitmentAI
+    profiles = get_scoring_profiles()
+    unknown = [name for name in names if name not in profiles]
+    if unknown:
+        raise click.ClickException(f"Unknown scoring profiles {unknown}; available: {sorted(profiles)}")
+    ai = RecruitmentAI(CSV_PATH, remote_cache=remote_csv, store=get_candidate_store(), workers=SCORING_WORKERS)
+    results = ai.compare_profiles([profiles[name] for name in names], candidate)
+    click.echo(json.dumps(results, ensure_ascii=False, indent=2))
+
+@app.cli.command('analyze-export')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--candidate', default=None, help="Candidate ID to report score / rank for.")
+@click.option('--profile', 'profile_name', default=SCORING_PROFILE, show_default=True, help="Scoring profile.")
+@click.option('--chunksize', default=100000, show_default=True, help="Rows scored at a time.")
+def analyze_export(path, candidate, profile_name, chunksize):
+    """Best candidate, bias summary and rank for a candidatos.csv export of any size, in bounded memory."""
+    from model_logic import RecruitmentAI
+    profiles = get_scoring_profiles()
+    if profile_name not in profiles:
+        raise click.ClickException(f"Unknown scoring profile {profile_name!r}; available: {sorted(profiles)}")
+    ai = RecruitmentAI(path)
+    results = ai.run_analysis_streaming(candidate, profiles[profile_name], chunksize=chunksize)
+    click.echo(json.dumps(results, ensure_ascii=False, indent=2))
+
+# --- Read-only analysis endpoints, served from the shared snapshot ---
+
+LEADERBOARD_MAX_LIMIT = 100
+
+@app.route('/leaderboard', methods=['GET'])
+def leaderboard():
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', 10, type=int), 1), LEADERBOARD_MAX_LIMIT)
+    snap = get_engine().snapshot()
+    return jsonify({
+        "version": snap.version,
+        "total": len(snap),
+        "offset": offset,
+        "limit": limit,
+        "candidates": snap.leaderboard(offset, limit)
+    })
+
+@app.route('/candidates/<candidate_id>', methods=['GET'])
+def candidate_score(candidate_id):
+    snap = get_engine().snapshot()
+    entry = snap.candidate(candidate_id)
+    if entry is None:
+        return jsonify({"status": "error", "message": f"Unknown candidate {candidate_id}"}), 404
+    entry["version"] = snap.version
+    return jsonify(entry)
+
+@app.route('/bias_summary', methods=['GET'])
+def bias_summary():
+    # Serialized once per snapshot version
+    return Response(get_engine().snapshot().bias_summary_json, mimetype='application/json')
+
+@app.route('/model/train', methods=['POST'])
+def train():
+    # Training runs in a separate process; poll GET /model for the outcome
+    started = get_training_job().start()
+    return jsonify({"status": "started" if started else "already_running"}), 202
+
+@app.route('/model', methods=['GET'])
+def model_status():
+    loaded = None
+    try:
+        current = get_model_registry().current()
+        if current is not None:
+            loaded = current[0]
+    except Exception as e:
+        print(f"Warning: availability model unavailable: {e}")
+    return jsonify({"training": get_training_job().status(), "loaded": loaded})
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    # Prometheus scrape target (values are for this worker process)
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
 #if __name__ == '__main__':
 #    app.run(debug=True, port=5000)
 
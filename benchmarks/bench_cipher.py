@@ -0,0 +1,98 @@
+"""
+Compatibility + speed check for MultiSubstitutionCipher.
+
+Compares the table-driven implementation against the original per-character,
+per-layer loop (kept below as LegacyCipher) byte for byte, then times both.
+
+    python benchmarks/bench_cipher.py [size_in_MB]
+"""
+import io
+import os
+import sys
+import json
+import time
+import random
+import string
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from encryption import MultiSubstitutionCipher
+
+
+class LegacyCipher(MultiSubstitutionCipher):
+    """The original encrypt/decrypt loops, used as reference."""
+
+    def encrypt(self, text):
+        if not isinstance(text, str):
+            text = json.dumps(text)
+        current_text = text
+        for enc_map, _ in self.maps:
+            new_text = []
+            for char in current_text:
+                new_text.append(enc_map.get(char, char))
+            current_text = "".join(new_text)
+        return current_text
+
+    def decrypt(self, text):
+        current_text = text
+        for _, dec_map in reversed(self.maps):
+            new_text = []
+            for char in current_text:
+                new_text.append(dec_map.get(char, char))
+            current_text = "".join(new_text)
+        return current_text
+
+
+def sample_text(size, alphabet=string.printable + "áéíóúñÑ€\u0000"):
+    rng = random.Random(0)
+    return "".join(rng.choice(alphabet) for _ in range(size))
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def check(seed, text):
+    new, old = MultiSubstitutionCipher(seed), LegacyCipher(seed)
+    enc_new, t_new = timed(new.encrypt, text)
+    enc_old, t_old = timed(old.encrypt, text)
+    dec_new, t_dec_new = timed(new.decrypt, enc_new)
+    dec_old, t_dec_old = timed(old.decrypt, enc_old)
+
+    same = enc_new == enc_old and dec_new == dec_old == text
+    same = same and new.encrypt_bytes(text.encode('utf-8')) == enc_old.encode('utf-8')
+    out = io.BytesIO()
+    new.encrypt_stream(io.BytesIO(text.encode('utf-8')), out, chunk_size=4093)
+    same = same and out.getvalue() == enc_old.encode('utf-8')
+    back = io.BytesIO()
+    new.decrypt_stream(io.BytesIO(out.getvalue()), back)
+    same = same and back.getvalue().decode('utf-8') == text
+
+    return same, {
+        "encrypt_s": {"table": round(t_new, 4), "legacy": round(t_old, 4)},
+        "decrypt_s": {"table": round(t_dec_new, 4), "legacy": round(t_dec_old, 4)},
+        "speedup": round((t_old + t_dec_old) / max(t_new + t_dec_new, 1e-9), 1),
+    }
+
+
+def main(size_mb=2.0):
+    size = int(size_mb * 1024 * 1024)
+    texts = {
+        # What the encrypted store actually sees: json.dumps output (ASCII)
+        "ascii_json": json.dumps({"data": sample_text(size, string.printable)}),
+        "unicode": sample_text(size),
+    }
+    results = {"size_chars": size, "compatible": True}
+    for label, text in texts.items():
+        for seed in (42, 7):
+            same, timings = check(seed, text)
+            results["compatible"] = results["compatible"] and same
+            results[f"{label}_seed_{seed}"] = timings
+
+    print(json.dumps(results, indent=2))
+    return 0 if results["compatible"] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(float(sys.argv[1]) if len(sys.argv) > 1 else 2.0))
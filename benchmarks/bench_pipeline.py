@@ -0,0 +1,380 @@
+"""
+Benchmark suite for the scoring and storage pipeline.
+
+Generates synthetic candidate pools in the candidatos.csv schema (sampled from
+data/candidatos.csv with a fixed seed) and measures, for every pool size:
+
+    load_csv        RecruitmentAI.load_combined_data, local rows from the CSV
+    load_store      RecruitmentAI.load_combined_data, local rows from the columnar store
+    run_analysis    RecruitmentAI.run_analysis (columnar store, as the app runs it;
+                    --workers N scores through the sharded process pool)
+    run_streaming   RecruitmentAI.run_analysis_streaming (columnar store, chunked)
+    cipher          MultiSubstitutionCipher encrypt/decrypt, per record and streamed
+    submit          POST /submit through Flask's test client until its job finishes
+
+The remote CSV is never fetched: every run gets a pre-seeded RemoteCSVCache
+snapshot of data/candidatos.csv with a TTL that does not expire.
+
+Each (benchmark, size) runs in a fresh interpreter so peak RSS is its own.
+The report (JSON) has throughput, p50 / p99 latency and peak memory.
+
+    python benchmarks/bench_pipeline.py [--sizes 1000,10000,100000,1000000]
+        [--benchmarks load_csv,...] [--repeat 5] [--workers 1] [--output report.json]
+        [--baseline old_report.json --max-regression 0.25]
+
+With --baseline, exits with status 1 when a p50 got slower than the baseline
+by more than --max-regression (a fraction), so it can gate CI.
+"""
+import os
+import sys
+import csv
+import json
+import time
+import shutil
+import argparse
+import platform
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+TEMPLATE_CSV = os.path.join(ROOT, 'data', 'candidatos.csv')
+REMOTE_URL = "https://raw.githubusercontent.com/allmore0/min_sesgos/main/candidatos.csv"
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+BENCHMARKS = ['load_csv', 'load_store', 'run_analysis', 'run_streaming', 'cipher', 'submit']
+SEED = 1234
+FIRST_ID = 1000 # synthetic IDs start after the real ones (DS01..DS101)
+NEVER_EXPIRES = 10 ** 9
+
+
+# --- pool generation --------------------------------------------------------
+
+def generate_pool(path, rows, seed=SEED, chunk=100000):
+    """Writes `rows` synthetic candidates to `path` (candidatos.csv schema)."""
+    import numpy as np
+    import pandas as pd
+    template = pd.read_csv(TEMPLATE_CSV, dtype=str, keep_default_na=False)
+    rng = np.random.default_rng(seed)
+    numeric = {
+        'Años de experiencia': lambda n: rng.integers(0, 21, n),
+        'Edad': lambda n: rng.integers(21, 61, n),
+        'Python_Porcentaje': lambda n: rng.integers(0, 101, n) / 100,
+        'R_Porcentaje': lambda n: rng.integers(0, 101, n) / 100,
+        'SQL_Porcentaje': lambda n: rng.integers(0, 101, n) / 100,
+        'Estadística_Avanzada_Porcentaje': lambda n: rng.integers(0, 101, n) / 100,
+        'Sueldo_mensual': lambda n: rng.integers(15, 121, n) * 1000,
+    }
+    tmp = f"{path}.{os.getpid()}.tmp"
+    for start in range(0, rows, chunk):
+        n = min(chunk, rows - start)
+        data = {}
+        for col in template.columns:
+            if col == 'ID':
+                data[col] = [f"DS{i:02d}" for i in range(FIRST_ID + start, FIRST_ID + start + n)]
+            elif col in numeric:
+                data[col] = numeric[col](n)
+            else:
+                # Same values (and share of blanks) as the real file
+                data[col] = rng.choice(template[col].to_numpy(), n)
+        pd.DataFrame(data, columns=template.columns).to_csv(tmp, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+    os.replace(tmp, path)
+
+
+def csv_headers():
+    # The app's CSV_HEADERS; read from the template so the driver never imports app
+    with open(TEMPLATE_CSV, 'r', encoding='utf-8', newline='') as f:
+        return next(csv.reader(f))
+
+
+def seed_remote_snapshot(data_dir):
+    """A RemoteCSVCache snapshot of the real candidatos.csv that never revalidates."""
+    os.makedirs(data_dir, exist_ok=True)
+    shutil.copyfile(TEMPLATE_CSV, os.path.join(data_dir, 'remote_candidatos.csv'))
+    with open(os.path.join(data_dir, 'remote_candidatos.meta.json'), 'w', encoding='utf-8') as f:
+        json.dump({'url': REMOTE_URL, 'etag': None, 'last_modified': None, 'checked_at': time.time()}, f)
+
+
+def prepare(workdir, rows):
+    """Pool CSV + columnar store for `rows`, built once and reused across runs."""
+    from candidate_store import ColumnarCandidateStore
+    pool_dir = os.path.join(workdir, f'pool_{rows}_seed{SEED}')
+    csv_path = os.path.join(pool_dir, 'new_candidates.csv')
+    store_path = os.path.join(pool_dir, 'candidate_store')
+    done = os.path.join(pool_dir, '.complete')
+    if not os.path.exists(done):
+        shutil.rmtree(pool_dir, ignore_errors=True)
+        os.makedirs(pool_dir)
+        generate_pool(csv_path, rows)
+        ColumnarCandidateStore(store_path, csv_headers()).import_csv(csv_path)
+        open(done, 'w').close()
+    return pool_dir
+
+
+# --- measurements (run inside a worker process) -------------------------------
+
+def _summary(latencies, units_per_run, unit):
+    import numpy as np
+    lat = np.asarray(latencies, dtype=float)
+    p50 = float(np.percentile(lat, 50))
+    return {
+        "runs": len(lat),
+        "p50_s": round(p50, 9),
+        "p99_s": round(float(np.percentile(lat, 99)), 9),
+        "mean_s": round(float(lat.mean()), 9),
+        "throughput": round(units_per_run / p50, 2) if p50 > 0 else None,
+        "throughput_unit": unit,
+    }
+
+
+def _timed_runs(fn, repeat, warmup=1):
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _source(pool_dir, scratch, use_store, workers=1):
+    from model_logic import RecruitmentAI
+    from remote_cache import RemoteCSVCache
+    from candidate_store import ColumnarCandidateStore
+    seed_remote_snapshot(scratch)
+    cache = RemoteCSVCache(REMOTE_URL, scratch, ttl=NEVER_EXPIRES)
+    store = ColumnarCandidateStore(os.path.join(pool_dir, 'candidate_store'), csv_headers()) if use_store else None
+    return RecruitmentAI(os.path.join(pool_dir, 'new_candidates.csv'), remote_cache=cache, store=store, workers=workers)
+
+
+def bench_load(pool_dir, scratch, rows, repeat, use_store):
+    ai = _source(pool_dir, scratch, use_store)
+    return _summary(_timed_runs(ai.load_combined_data, repeat), rows, 'rows/s')
+
+
+def bench_run_analysis(pool_dir, scratch, rows, repeat, workers=1):
+    ai = _source(pool_dir, scratch, use_store=True, workers=workers)
+    last_id = f"DS{FIRST_ID + rows - 1:02d}"
+    result = {}
+    def run():
+        result.update(ai.run_analysis(last_id))
+    stats = _summary(_timed_runs(run, repeat), rows, 'rows/s')
+    stats["best_candidate"] = result.get("best_candidate")
+    stats["workers"] = workers
+    return stats
+
+
+def bench_run_streaming(pool_dir, scratch, rows, repeat):
+    # The last candidate: its rank needs the second (counting) pass over the pool
+    ai = _source(pool_dir, scratch, use_store=True)
+    last_id = f"DS{FIRST_ID + rows - 1:02d}"
+    result = {}
+    def run():
+        result.update(ai.run_analysis_streaming(last_id))
+    stats = _summary(_timed_runs(run, repeat), rows, 'rows/s')
+    stats["best_candidate"] = result.get("best_candidate")
+    return stats
+
+
+def bench_cipher(pool_dir, scratch, rows, repeat, sample=2000):
+    from encryption import MultiSubstitutionCipher
+    cipher = MultiSubstitutionCipher()
+    csv_path = os.path.join(pool_dir, 'new_candidates.csv')
+
+    # Per record, as the encrypted store sees them (json.dumps of one record)
+    with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+        texts = [json.dumps(rec) for _, rec in zip(range(sample), csv.DictReader(f))]
+    enc_lat, dec_lat = [], []
+    for _ in range(repeat):
+        for text in texts:
+            start = time.perf_counter()
+            encrypted = cipher.encrypt(text)
+            mid = time.perf_counter()
+            cipher.decrypt(encrypted)
+            enc_lat.append(mid - start)
+            dec_lat.append(time.perf_counter() - mid)
+
+    # Whole pool streamed in chunks (bounded memory)
+    size = os.path.getsize(csv_path)
+    enc_path = os.path.join(scratch, 'pool.enc')
+    stream_enc, stream_dec = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with open(csv_path, 'rb') as src, open(enc_path, 'wb') as dst:
+            cipher.encrypt_stream(src, dst)
+        mid = time.perf_counter()
+        with open(enc_path, 'rb') as src, open(os.devnull, 'wb') as dst:
+            cipher.decrypt_stream(src, dst)
+        stream_enc.append(mid - start)
+        stream_dec.append(time.perf_counter() - mid)
+    os.remove(enc_path)
+
+    return {
+        "record_encrypt": _summary(enc_lat, 1, 'records/s'),
+        "record_decrypt": _summary(dec_lat, 1, 'records/s'),
+        "stream_encrypt": _summary(stream_enc, size / 2 ** 20, 'MB/s'),
+        "stream_decrypt": _summary(stream_dec, size / 2 ** 20, 'MB/s'),
+    }
+
+
+def bench_submit(pool_dir, scratch, rows, repeat, requests_per_run=20):
+    # The app reads its paths at import time: point it at a copy of the pool
+    data_dir = os.path.join(scratch, 'data')
+    seed_remote_snapshot(data_dir)
+    shutil.copyfile(os.path.join(pool_dir, 'new_candidates.csv'), os.path.join(data_dir, 'new_candidates.csv'))
+    shutil.copytree(os.path.join(pool_dir, 'candidate_store'), os.path.join(data_dir, 'candidate_store'))
+    os.environ['RECRUITMENT_DATA_DIR'] = data_dir
+    os.environ['REMOTE_CSV_TTL'] = str(NEVER_EXPIRES)
+    import app as webapp
+    client = webapp.app.test_client()
+    webapp.get_engine().snapshot() # warm: pool loaded and scored before timing
+
+    payload = {
+        "datos_personales": {"nombre": "Bench", "apellido_paterno": "Mark", "edad": "30", "genero": "Femenino"},
+        "datos_laborales_y_habilidades": {"años_experiencia": "5", "titulo_profesional": "M.Sc. en Ciencia de Datos",
+                                          "certificaciones": ["AWS ML Specialty"], "idioma": "Inglés", "nivel_idioma": "C1"},
+        "porcentajes_conocimiento": {"python": "90", "r": "40", "sql": "80", "estadistica_avanzada": "70"},
+    }
+    accept_lat, done_lat = [], []
+    failures = 0
+    for _ in range(repeat):
+        for _ in range(requests_per_run):
+            start = time.perf_counter()
+            r = client.post('/submit', json=payload)
+            accepted = time.perf_counter()
+            job_id = r.get_json()['job_id']
+            while True:
+                job = webapp.job_queue.get(job_id)
+                if job and job['state'] in ('finished', 'failed'):
+                    break
+                time.sleep(0.0005)
+            failures += job['state'] != 'finished'
+            accept_lat.append(accepted - start)
+            done_lat.append(time.perf_counter() - start)
+    return {
+        "accepted": _summary(accept_lat, 1, 'requests/s'),
+        "completed": _summary(done_lat, 1, 'requests/s'),
+        "failed_jobs": failures,
+    }
+
+
+def run_worker(name, pool_dir, scratch, rows, repeat, workers=1):
+    import resource
+    runners = {
+        'load_csv': lambda: bench_load(pool_dir, scratch, rows, repeat, use_store=False),
+        'load_store': lambda: bench_load(pool_dir, scratch, rows, repeat, use_store=True),
+        'run_analysis': lambda: bench_run_analysis(pool_dir, scratch, rows, repeat, workers),
+        'run_streaming': lambda: bench_run_streaming(pool_dir, scratch, rows, repeat),
+        'cipher': lambda: bench_cipher(pool_dir, scratch, rows, repeat),
+        'submit': lambda: bench_submit(pool_dir, scratch, rows, repeat),
+    }
+    result = runners[name]()
+    result["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0, 1)
+    return result
+
+
+# --- driver -----------------------------------------------------------------
+
+def _p50s(report):
+    """{(benchmark, rows, metric): p50} for every timing in a report."""
+    out = {}
+    for entry in report.get("results", []):
+        stack = [((), entry.get("result", {}))]
+        while stack:
+            path, node = stack.pop()
+            if not isinstance(node, dict):
+                continue
+            if "p50_s" in node:
+                out[(entry["benchmark"], entry["rows"], "/".join(path))] = node["p50_s"]
+            stack.extend((path + (k,), v) for k, v in node.items() if isinstance(v, dict))
+    return out
+
+
+def compare(report, baseline, max_regression):
+    failures = []
+    old = _p50s(baseline)
+    for key, p50 in sorted(_p50s(report).items()):
+        if key in old and old[key] > 0 and p50 > old[key] * (1 + max_regression):
+            failures.append(f"{key[0]}[{key[1]}]{'/' + key[2] if key[2] else ''}: p50 {p50}s vs baseline {old[key]}s")
+    return failures
+
+
+def environment():
+    import numpy as np
+    import pandas as pd
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "seed": SEED,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)))
+    parser.add_argument('--benchmarks', default=','.join(BENCHMARKS))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=1, help="scoring processes for run_analysis")
+    parser.add_argument('--workdir', default=os.path.join(ROOT, 'benchmarks', '.data'),
+                        help="where generated pools are cached between runs")
+    parser.add_argument('--output', default=None, help="also write the JSON report here")
+    parser.add_argument('--baseline', default=None, help="previous report to compare p50s against")
+    parser.add_argument('--max-regression', type=float, default=0.25)
+    # internal: one measurement in this (fresh) process
+    parser.add_argument('--worker', default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--pool-dir', default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--scratch', default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--rows', type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.pool_dir, args.scratch, args.rows, args.repeat, args.workers)))
+        return 0
+
+    sizes = [int(s) for s in args.sizes.split(',') if s]
+    names = [b for b in args.benchmarks.split(',') if b]
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {sorted(unknown)}")
+
+    report = {"environment": environment(), "repeat": args.repeat, "workers": args.workers, "results": []}
+    for rows in sizes:
+        start = time.perf_counter()
+        pool_dir = prepare(args.workdir, rows)
+        print(f"pool {rows}: ready in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+        for name in names:
+            scratch = os.path.join(args.workdir, f'scratch_{name}_{rows}')
+            shutil.rmtree(scratch, ignore_errors=True)
+            os.makedirs(scratch)
+            cmd = [sys.executable, os.path.abspath(__file__), '--worker', name, '--pool-dir', pool_dir,
+                   '--scratch', scratch, '--rows', str(rows), '--repeat', str(args.repeat),
+                   '--workers', str(args.workers)]
+            out = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+            shutil.rmtree(scratch, ignore_errors=True)
+            entry = {"benchmark": name, "rows": rows}
+            if out.returncode != 0:
+                entry["error"] = out.stderr.strip().splitlines()[-1] if out.stderr.strip() else f"exit {out.returncode}"
+            else:
+                entry["result"] = json.loads(out.stdout.strip().splitlines()[-1])
+            report["results"].append(entry)
+            print(f"  {name}: {'error' if 'error' in entry else 'ok'}", file=sys.stderr)
+
+    failures = [f"{e['benchmark']}[{e['rows']}]: {e['error']}" for e in report["results"] if "error" in e]
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            failures += compare(report, json.load(f), args.max_regression)
+    report["failures"] = failures
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    print(text)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
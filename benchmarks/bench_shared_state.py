@@ -0,0 +1,186 @@
+"""
+Multi-process check of the shared scoring state (shared_state.py).
+
+Starts N worker processes on one copy of a synthetic pool, each with its own
+ScoringEngine on the same SQLite file, like N gunicorn workers:
+
+    load        first snapshot() of every worker (one scores and publishes,
+                the others wait and load the published pool)
+    submit      every worker appends and scores its own candidates while
+                reading snapshot() after each one, all at the same time
+    propagate   worker 0 adds one candidate; time until every other worker's
+                snapshot() has it
+    idle        snapshot() when nothing changed (the data_version check)
+
+At the end every worker must report the same leaderboard and bias summary,
+and the same scores / population counts as a fresh single-process engine
+on the final pool.
+
+    python benchmarks/bench_shared_state.py [--workers 4] [--rows 10000]
+        [--submits 50] [--output report.json]
+
+Exits with status 1 when the workers disagree, so it can gate CI.
+"""
+import os
+import sys
+import csv
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import multiprocessing
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import bench_pipeline as bp
+
+PROBE_ID = 'DSPROBE'
+
+
+def _engine(pool_dir, scratch, shared_path):
+    from model_logic import ScoringEngine
+    from remote_cache import RemoteCSVCache
+    from candidate_store import ColumnarCandidateStore
+    from shared_state import SharedScoreState
+    cache = RemoteCSVCache(bp.REMOTE_URL, scratch, ttl=bp.NEVER_EXPIRES)
+    store = ColumnarCandidateStore(os.path.join(pool_dir, 'candidate_store'), bp.csv_headers())
+    shared = SharedScoreState(shared_path) if shared_path else None
+    return ScoringEngine(os.path.join(pool_dir, 'new_candidates.csv'), remote_cache=cache, store=store, shared=shared)
+
+
+def _template_rows():
+    with open(bp.TEMPLATE_CSV, 'r', encoding='utf-8', newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def _fingerprint(snap):
+    payload = json.dumps([snap.ranked, json.loads(snap.bias_summary_json)["bias_summary"]], sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def _pct(values, q):
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(q / 100 * len(values)))], 6) if values else None
+
+
+def worker(index, pool_dir, scratch, shared_path, submits, barrier, probe_written, results):
+    try:
+        engine = _engine(pool_dir, scratch, shared_path)
+        stats = {"worker": index, "pid": os.getpid()}
+
+        barrier.wait()
+        start = time.perf_counter()
+        engine.snapshot()
+        stats["load_s"] = round(time.perf_counter() - start, 4)
+
+        barrier.wait()
+        template = _template_rows()
+        add, read = [], []
+        for k in range(submits):
+            row = dict(template[(index * submits + k) % len(template)])
+            row['ID'] = f"DSW{index}x{k}"
+            engine.source.store.append_rows([row]) # persisted first, as process_submission does
+            start = time.perf_counter()
+            engine.add_candidate(row)
+            add.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            engine.snapshot() # applies what the other workers added meanwhile
+            read.append(time.perf_counter() - start)
+        stats["add_candidate_p50_s"], stats["add_candidate_p99_s"] = _pct(add, 50), _pct(add, 99)
+        stats["snapshot_after_writes_p50_s"] = _pct(read, 50)
+
+        barrier.wait()
+        if index == 0:
+            row = dict(template[0])
+            row['ID'] = PROBE_ID
+            engine.source.store.append_rows([row])
+            probe_written.value = time.time()
+            engine.add_candidate(row)
+        else:
+            while PROBE_ID not in engine.snapshot().ranks:
+                time.sleep(0.0005)
+            stats["propagation_s"] = round(time.time() - probe_written.value, 6)
+
+        barrier.wait()
+        start = time.perf_counter()
+        for _ in range(1000):
+            engine.snapshot()
+        stats["idle_snapshot_us"] = round((time.perf_counter() - start) * 1000, 3)
+
+        barrier.wait() # nobody writes from here on
+        snap = engine.snapshot()
+        stats["candidates"] = len(snap)
+        stats["fingerprint"] = _fingerprint(snap)
+        results.put(stats)
+    except Exception as e:
+        results.put({"worker": index, "error": f"{type(e).__name__}: {e}"})
+        barrier.abort()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--submits', type=int, default=50, help="candidates added by each worker")
+    parser.add_argument('--workdir', default=os.path.join(ROOT, 'benchmarks', '.data'),
+                        help="where generated pools are cached between runs")
+    parser.add_argument('--output', default=None, help="also write the JSON report here")
+    args = parser.parse_args()
+
+    pool_dir = os.path.join(args.workdir, f'shared_state_{args.rows}')
+    scratch = os.path.join(pool_dir, 'scratch')
+    shutil.rmtree(pool_dir, ignore_errors=True)
+    # Submissions append to the pool: work on a copy of the cached one
+    shutil.copytree(bp.prepare(args.workdir, args.rows), pool_dir)
+    bp.seed_remote_snapshot(scratch)
+    shared_path = os.path.join(pool_dir, 'scores.sqlite3')
+
+    ctx = multiprocessing.get_context('spawn')
+    barrier = ctx.Barrier(args.workers)
+    probe_written = ctx.Value('d', 0.0)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(i, pool_dir, scratch, shared_path, args.submits, barrier, probe_written, results))
+             for i in range(args.workers)]
+    for p in procs:
+        p.start()
+    stats = sorted((results.get() for _ in procs), key=lambda s: s["worker"])
+    for p in procs:
+        p.join()
+
+    failures = [f"worker {s['worker']}: {s['error']}" for s in stats if "error" in s]
+    report = {"environment": bp.environment(), "workers": args.workers, "rows": args.rows,
+              "submits_per_worker": args.submits, "per_worker": stats}
+    if not failures:
+        if len({s["fingerprint"] for s in stats}) != 1:
+            failures.append("workers disagree on the leaderboard / bias summary")
+        # Ground truth: the final pool scored from scratch in this process
+        # (arrival order of equal scores may differ, scores and counts may not)
+        fresh = _engine(pool_dir, scratch, None)
+        fresh.load()
+        shared = _engine(pool_dir, scratch, shared_path)
+        shared.load()
+        scores = lambda e: {cand_id: e._candidates[cand_id]['Score_Final'] for cand_id in e._candidates}
+        if scores(fresh) != scores(shared):
+            failures.append("shared scores differ from a fresh load")
+        if fresh._bias.population != shared._bias.population:
+            failures.append("shared bias counts differ from a fresh load")
+        report["candidates"] = len(fresh._candidates)
+        report["expected_candidates"] = stats[0]["candidates"]
+        if report["candidates"] != report["expected_candidates"]:
+            failures.append("workers are missing candidates")
+    report["failures"] = failures
+    shutil.rmtree(pool_dir, ignore_errors=True)
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    print(text)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+Cold-start cost of a worker: wall time and peak RSS of `import app`.
+
+Each run is a fresh interpreter, like a newly spawned gunicorn worker. It also
+reports which heavy modules got imported, since none of them are needed to
+serve `/`.
+
+The app runs against a scratch RECRUITMENT_DATA_DIR seeded with a non-empty
+database (`--records` submissions in database.jsonl, the encrypted frames and
+new_candidates.csv), so work that grows with the data shows up in the numbers
+and the repo's data/ is left untouched. The directory is removed afterwards.
+
+    python benchmarks/bench_startup.py [--runs 5] [--records 10000]
+        [--max-seconds 1.0] [--max-rss-mb 80]
+
+Exits with status 1 when a threshold is exceeded or a heavy module is
+imported, so it can gate CI.
+"""
+import os
+import sys
+import csv
+import json
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+TEMPLATE_CSV = os.path.join(ROOT, 'data', 'candidatos.csv')
+
+HEAVY_MODULES = ['pandas', 'numpy', 'tensorflow', 'sklearn', 'matplotlib', 'requests']
+
+PROBE = """
+import sys, json, time, resource
+start = time.perf_counter()
+import app
+elapsed = time.perf_counter() - start
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({
+    "import_s": elapsed,
+    "max_rss_mb": rss_kb / 1024.0,
+    "heavy_loaded": [m for m in %r if m in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def seed_data_dir(data_dir, records):
+    """Fills `data_dir` with `records` submissions, written through the app's own stores."""
+    from encryption import MultiSubstitutionCipher
+    from record_store import JSONLRecordStore, EncryptedRecordStore
+    with open(TEMPLATE_CSV, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        headers = next(reader)
+        template = [row for row in reader if row]
+    shutil.copy(TEMPLATE_CSV, os.path.join(data_dir, 'candidatos.csv'))
+
+    rows = []
+    for i in range(records):
+        row = list(template[i % len(template)])
+        row[0] = f"DS{i + 1}"
+        rows.append(row)
+    with open(os.path.join(data_dir, 'new_candidates.csv'), 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        writer.writerows(rows)
+
+    store = JSONLRecordStore(os.path.join(data_dir, 'database.jsonl'))
+    store.append_many([dict(zip(headers[1:], row[1:]), id=row[0]) for row in rows])
+    EncryptedRecordStore(os.path.join(data_dir, 'encrypted_database.frames'), MultiSubstitutionCipher(),
+                         seed=store.iter_records)
+
+
+def run_once(data_dir):
+    env = dict(os.environ, RECRUITMENT_DATA_DIR=data_dir)
+    out = subprocess.run([sys.executable, '-c', PROBE], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--records', type=int, default=10000, help="submissions already in the seeded database")
+    parser.add_argument('--max-seconds', type=float, default=None)
+    parser.add_argument('--max-rss-mb', type=float, default=None)
+    args = parser.parse_args()
+
+    data_dir = tempfile.mkdtemp(prefix='bench_startup_')
+    try:
+        seed_data_dir(data_dir, args.records)
+        runs = [run_once(data_dir) for _ in range(args.runs)]
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    times = sorted(r['import_s'] for r in runs)
+    report = {
+        "runs": args.runs,
+        "records": args.records,
+        "import_s": {"min": round(times[0], 4), "p50": round(statistics.median(times), 4), "max": round(times[-1], 4)},
+        "max_rss_mb": round(max(r['max_rss_mb'] for r in runs), 1),
+        "heavy_loaded": sorted({m for r in runs for m in r['heavy_loaded']}),
+    }
+    failures = []
+    if report["heavy_loaded"]:
+        failures.append(f"heavy modules imported at startup: {report['heavy_loaded']}")
+    if args.max_seconds is not None and report["import_s"]["p50"] > args.max_seconds:
+        failures.append(f"p50 import time {report['import_s']['p50']}s > {args.max_seconds}s")
+    if args.max_rss_mb is not None and report["max_rss_mb"] > args.max_rss_mb:
+        failures.append(f"peak RSS {report['max_rss_mb']} MB > {args.max_rss_mb} MB")
+    report["failures"] = failures
+
+    print(json.dumps(report, indent=2))
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
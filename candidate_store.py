@@ -0,0 +1,239 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+import metrics
+from record_store import FileLock
+
+# Pre-typed numeric columns (float64 on disk, NaN = missing)
+NUMERIC_COLUMNS = [
+    'Años de experiencia', 'Edad', 'Python_Porcentaje', 'R_Porcentaje',
+    'SQL_Porcentaje', 'Estadística_Avanzada_Porcentaje', 'Sueldo_mensual'
+]
+# Numeric columns handed back as int64 when complete, like pd.read_csv does
+INT_COLUMNS = ['Años de experiencia', 'Edad', 'Sueldo_mensual']
+
+
+class ColumnarCandidateStore:
+    """
+    Column-per-file candidate store that replaces re-parsing new_candidates.csv.
+
+    Numeric columns are raw float64 files; every other column is dictionary
+    encoded (int32 codes + a JSON Lines list of categories, -1 = missing).
+    Reads memory-map only the requested columns, appends only add bytes at
+    the end. meta.json holds the committed row / category counts, so bytes
+    from an interrupted append are ignored and cut on the next one.
+    """
+
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = list(columns)
+        self.meta_path = os.path.join(path, 'meta.json')
+        os.makedirs(path, exist_ok=True)
+        self._lock = FileLock(os.path.join(path, 'store.lock'))
+        self._categories = {} # col -> (ncats, bytes read, [values], {value: code})
+        self._pending = {}
+        with self._lock:
+            if not os.path.exists(self.meta_path):
+                self._write_meta({'rows': 0, 'columns': self.columns, 'ncats': {}, 'cats_bytes': {}})
+            self.columns = self._read_meta()['columns']
+
+    # --- files --------------------------------------------------------------
+
+    def _read_meta(self):
+        with open(self.meta_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write_meta(self, meta):
+        tmp = f"{self.meta_path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.meta_path)
+
+    def _data_file(self, col):
+        i = self.columns.index(col)
+        return os.path.join(self.path, f"{i:03d}.f8" if col in NUMERIC_COLUMNS else f"{i:03d}.i4")
+
+    def _cats_file(self, col):
+        return os.path.join(self.path, f"{self.columns.index(col):03d}.cats.jsonl")
+
+    def _dtype(self, col):
+        return np.float64 if col in NUMERIC_COLUMNS else np.int32
+
+    def _load_categories(self, col, meta):
+        """(cats, lookup) for the committed categories of `col`, read incrementally."""
+        ncats = meta['ncats'].get(col, 0)
+        nbytes = meta['cats_bytes'].get(col, 0)
+        cached = self._categories.get(col)
+        if cached is None or cached[0] > ncats or cached[1] > nbytes:
+            cached = (0, 0, [], {})
+        done, offset, cats, lookup = cached
+        if done < ncats:
+            # Only the categories appended since our last look (maybe by another worker)
+            with open(self._cats_file(col), 'rb') as f:
+                f.seek(offset)
+                for line in f:
+                    if done == ncats:
+                        break
+                    value = json.loads(line)
+                    lookup[value] = len(cats)
+                    cats.append(value)
+                    offset += len(line)
+                    done += 1
+        self._categories[col] = (done, offset, cats, lookup)
+        return cats, lookup
+
+    # --- public API ---------------------------------------------------------
+
+    def __len__(self):
+        return self._read_meta()['rows']
+
+    def append_rows(self, rows):
+        """Appends rows (dicts keyed by CSV headers, or lists in column order)."""
+        if not rows:
+            return
+        if not isinstance(rows[0], dict):
+            rows = [dict(zip(self.columns, row)) for row in rows]
+        written = 0
+        with self._lock:
+            meta = self._read_meta()
+            n = meta['rows']
+            self._pending = {}
+            files = []
+            try:
+                # Write every column / category file first and fsync them in one
+                # pass afterwards: the writeback of all of them overlaps instead of
+                # waiting for each file in turn. meta.json commits only after that.
+                for col in self.columns:
+                    values = [row.get(col) for row in rows]
+                    if col in NUMERIC_COLUMNS:
+                        # An object array, not a Series: the Series setup dominates for one row
+                        data = np.asarray(pd.to_numeric(np.array(values, dtype=object), errors='coerce'), dtype=np.float64)
+                    else:
+                        data, payload = self._encode(col, values, meta)
+                        if payload:
+                            files.append(self._append_file(self._cats_file(col), meta['cats_bytes'][col] - len(payload), payload))
+                    files.append(self._append_file(self._data_file(col), n * np.dtype(self._dtype(col)).itemsize, data.tobytes()))
+                    written += data.nbytes
+                for f in files:
+                    f.flush()
+                    os.fsync(f.fileno())
+            finally:
+                for f in files:
+                    f.close()
+            meta['rows'] = n + len(rows)
+            self._write_meta(meta)
+            self._categories.update(self._pending)
+            self._pending = {}
+        metrics.inc('bytes_written_total', written, target='candidate_store')
+
+    def _append_file(self, path, committed, payload):
+        """Opens `path`, cuts it to its `committed` size and writes `payload` (not yet fsynced)."""
+        f = open(path, 'ab')
+        try:
+            # Drop leftovers of an interrupted append before adding ours
+            f.truncate(committed)
+            f.write(payload)
+        except BaseException:
+            f.close()
+            raise
+        return f
+
+    def _encode(self, col, values, meta):
+        """(codes, bytes to append to the categories file) for `values`."""
+        cats, lookup = self._load_categories(col, meta)
+        # Until meta.json is written the new categories are not committed
+        self._categories.pop(col)
+        new_values = []
+        codes = np.empty(len(values), dtype=np.int32)
+        for i, value in enumerate(values):
+            if value is None or (not isinstance(value, str) and pd.isna(value)) or value == '':
+                codes[i] = -1 # missing, like an empty CSV cell
+                continue
+            value = str(value)
+            code = lookup.get(value)
+            if code is None:
+                code = lookup[value] = len(cats)
+                cats.append(value)
+                new_values.append(value)
+            codes[i] = code
+        payload = ''.join(json.dumps(v, ensure_ascii=False) + '\n' for v in new_values).encode('utf-8')
+        nbytes = meta['cats_bytes'].get(col, 0) + len(payload)
+        meta['ncats'][col] = len(cats)
+        meta['cats_bytes'][col] = nbytes
+        self._pending[col] = (len(cats), nbytes, cats, lookup)
+        return codes, payload
+
+    def read(self, columns=None):
+        """
+        DataFrame with only `columns` (all by default). Numeric columns come
+        back as (memory-mapped) float64 / int64, text columns as categoricals.
+        """
+        with self._lock:
+            return self._read(columns)
+
+    def _read(self, columns):
+        meta = self._read_meta()
+        n = meta['rows']
+        columns = [c for c in (columns or self.columns) if c in self.columns]
+        data = {}
+        for col in columns:
+            values = self._memmap(col, n)
+            metrics.inc('bytes_read_total', values.nbytes, source='candidate_store')
+            data[col] = self._column(col, values, self._column_info(col, values, meta))
+        return pd.DataFrame(data, columns=columns)
+
+    def _memmap(self, col, n):
+        if not n:
+            return np.empty(0, dtype=self._dtype(col))
+        return np.memmap(self._data_file(col), dtype=self._dtype(col), mode='r', shape=(n,))
+
+    def _column_info(self, col, values, meta):
+        """Per column, decided on all committed rows: int64-ness or the category Index."""
+        if col in NUMERIC_COLUMNS:
+            return col in INT_COLUMNS and len(values) and not np.isnan(values).any() and (values == np.floor(values)).all()
+        cats, _ = self._load_categories(col, meta)
+        return pd.Index(cats[:meta['ncats'].get(col, 0)], dtype=object)
+
+    def _column(self, col, values, info):
+        if col in NUMERIC_COLUMNS:
+            return values.astype(np.int64) if info else values
+        return pd.Categorical.from_codes(np.asarray(values), categories=info)
+
+    def iter_chunks(self, columns=None, chunksize=100000):
+        """
+        Same frames as read(), `chunksize` rows at a time, so only one chunk
+        is materialized. Rows committed after the call starts are not included.
+        """
+        with self._lock:
+            meta = self._read_meta()
+            n = meta['rows']
+            columns = [c for c in (columns or self.columns) if c in self.columns]
+            info = {col: self._column_info(col, self._memmap(col, n), meta) for col in columns}
+        # Committed rows are never rewritten, so the chunks can be read unlocked.
+        # Plain reads (not the memmap) keep only the current chunk resident.
+        for start in range(0, n, chunksize):
+            count = min(chunksize, n - start)
+            data = {}
+            for col in columns:
+                dtype = np.dtype(self._dtype(col))
+                values = np.fromfile(self._data_file(col), dtype=dtype, count=count, offset=start * dtype.itemsize)
+                metrics.inc('bytes_read_total', values.nbytes, source='candidate_store')
+                data[col] = self._column(col, values, info[col])
+            yield pd.DataFrame(data, columns=columns)
+
+    def import_csv(self, csv_path, chunksize=50000):
+        """Bulk load of an existing CSV."""
+        try:
+            for chunk in pd.read_csv(csv_path, dtype=str, keep_default_na=False, chunksize=chunksize):
+                self.append_rows(chunk.reindex(columns=self.columns).to_dict('records'))
+        except pd.errors.EmptyDataError:
+            pass
+
+    def bootstrap_from_csv(self, csv_path):
+        """Imports `csv_path` once, if the store is still empty (safe across workers)."""
+        with self._lock:
+            if len(self) == 0 and os.path.exists(csv_path):
+                self.import_csv(csv_path)
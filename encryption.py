@@ -10,6 +10,7 @@ class MultiSubstitutionCipher:
         self.key_seed = key_seed
         self.num_layers = 3 # Number of substitution layers
         self.maps = self._generate_maps()
+        self._build_tables()
 
     def _generate_maps(self):
         """Genera el multiple random de mapeo para substitucion."""
@@ -24,28 +25,63 @@ class MultiSubstitutionCipher:
             maps.append((enc_map, dec_map))
         return maps
 
+    def _build_tables(self):
+        """
+        Compone las capas en una sola permutacion (aplicar las capas una tras
+        otra equivale a una sola sustitucion) y la deja lista para
+        str.translate / bytes.translate.
+        """
+        chars = string.printable
+        composed = []
+        for char in chars:
+            for enc_map, _ in self.maps:
+                char = enc_map[char]
+            composed.append(char)
+        composed = "".join(composed)
+        self._enc_table = str.maketrans(chars, composed)
+        self._dec_table = str.maketrans(composed, chars)
+        # string.printable es ASCII: los bytes >= 0x80 (UTF-8 multibyte) no cambian
+        self._enc_bytes = bytes.maketrans(chars.encode('ascii'), composed.encode('ascii'))
+        self._dec_bytes = bytes.maketrans(composed.encode('ascii'), chars.encode('ascii'))
+
     def encrypt(self, text):
         """Aplicando las multiples layers de substitucion."""
         if not isinstance(text, str):
             text = json.dumps(text) # Convert dict/list to string if needed
-        
-        current_text = text
-        for enc_map, _ in self.maps:
-            new_text = []
-            for char in current_text:
-                new_text.append(enc_map.get(char, char))
-            current_text = "".join(new_text)
-        return current_text
+        if text.isascii():
+            # Camino rapido (json.dumps produce ASCII por defecto)
+            return text.encode('ascii').translate(self._enc_bytes).decode('ascii')
+        return text.translate(self._enc_table)
 
     def decrypt(self, text):
         """Reversando las multiples layers de substitucion."""
-        current_text = text
-        for _, dec_map in reversed(self.maps):
-            new_text = []
-            for char in current_text:
-                new_text.append(dec_map.get(char, char))
-            current_text = "".join(new_text)
-        return current_text
+        if text.isascii():
+            return text.encode('ascii').translate(self._dec_bytes).decode('ascii')
+        return text.translate(self._dec_table)
+
+    def encrypt_bytes(self, data):
+        """Igual que encrypt() pero sobre texto UTF-8 ya codificado."""
+        return data.translate(self._enc_bytes)
+
+    def decrypt_bytes(self, data):
+        return data.translate(self._dec_bytes)
+
+    def _translate_stream(self, table, src, dst, chunk_size):
+        # La sustitucion es byte a byte, asi que se puede cortar en cualquier punto
+        total = 0
+        while True:
+            chunk = src.read(chunk_size)
+            if not chunk:
+                return total
+            dst.write(chunk.translate(table))
+            total += len(chunk)
+
+    def encrypt_stream(self, src, dst, chunk_size=1 << 20):
+        """Cifra de un archivo binario a otro por bloques. Regresa los bytes procesados."""
+        return self._translate_stream(self._enc_bytes, src, dst, chunk_size)
+
+    def decrypt_stream(self, src, dst, chunk_size=1 << 20):
+        return self._translate_stream(self._dec_bytes, src, dst, chunk_size)
 
 # Example usage
 # cipher = MultiSubstitutionCipher()
@@ -0,0 +1,92 @@
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError: # Windows: only the in-process lock applies
+    fcntl = None
+
+
+class IDAllocator:
+    """
+    Hands out `DS` IDs from a small persistent counter file.
+
+    The counter is seeded once from the existing data (`seed` returns the
+    current max numeric ID) and from then on every allocation is a locked
+    read-increment-write of a single integer, safe across threads (in-process
+    lock) and across gunicorn workers (flock on a side lock file).
+
+    `floor` (optional) returns the max numeric ID of data that can change or
+    be missing, the remote CSV: the counter is raised past it on every
+    allocation. While it returns None (never fetched) the counter is not
+    written: IDs are handed out from `<counter>.partial` and the counter is
+    seeded once the floor is known.
+    """
+
+    def __init__(self, counter_path, seed=None, prefix='DS', floor=None):
+        self.counter_path = counter_path
+        self.partial_path = counter_path + '.partial'
+        self.lock_path = counter_path + '.lock'
+        self.seed = seed
+        self.floor = floor
+        self.prefix = prefix
+        self._lock = threading.Lock()
+
+    def _read_counter(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    def _write_counter(self, path, value):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(str(value))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def format_id(self, number):
+        return f"{self.prefix}{number:02d}"
+
+    def allocate(self):
+        """Returns the next free ID, e.g. 'DS102'."""
+        return self.format_id(self._reserve(1))
+
+    def allocate_block(self, count):
+        """Reserves `count` consecutive IDs with a single counter update."""
+        if count <= 0:
+            return []
+        first = self._reserve(count)
+        return [self.format_id(n) for n in range(first, first + count)]
+
+    def _reserve(self, count):
+        # Returns the first number of a block of `count` fresh numbers
+        with self._lock:
+            os.makedirs(os.path.dirname(self.counter_path) or '.', exist_ok=True)
+            with open(self.lock_path, 'a') as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    counter = last = self._read_counter(self.counter_path)
+                    if counter is None:
+                        # First run (or unreadable counter): start from the data once,
+                        # or from what was handed out while the floor was unknown
+                        last = self._read_counter(self.partial_path)
+                        if last is None:
+                            last = self.seed() if self.seed else 0
+                    floor = self.floor() if self.floor else 0
+                    if floor is not None:
+                        last = max(last, floor)
+                    if counter is not None or floor is not None:
+                        self._write_counter(self.counter_path, last + count)
+                        if counter is None and os.path.exists(self.partial_path):
+                            os.remove(self.partial_path)
+                    else:
+                        # A seed without the remote IDs may be too low: keep it provisional
+                        self._write_counter(self.partial_path, last + count)
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return last + 1
@@ -0,0 +1,102 @@
+import os
+import json
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import metrics
+
+
+class JobQueue:
+    """
+    In-process worker pool for the slow part of a submission (scoring and
+    ranking). Every state change is also written to `jobs_dir/<id>.json`,
+    so /jobs/<id> can be answered by any gunicorn worker, not only the one
+    that queued the job. Queued jobs die with their worker, so a job must
+    not hold anything that is not persisted elsewhere.
+    """
+
+    def __init__(self, jobs_dir, max_workers=2, keep_in_memory=1000, retention=24 * 3600):
+        self.jobs_dir = jobs_dir
+        self.keep_in_memory = keep_in_memory
+        self.retention = retention
+        os.makedirs(jobs_dir, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='submit-job')
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict() # job_id -> state dict (most recent last)
+        self._submitted = 0
+
+    def _path(self, job_id):
+        return os.path.join(self.jobs_dir, f"{job_id}.json")
+
+    def _save(self, job):
+        with self._lock:
+            self._jobs[job['job_id']] = job
+            self._jobs.move_to_end(job['job_id'])
+            while len(self._jobs) > self.keep_in_memory:
+                self._jobs.popitem(last=False)
+        path = self._path(job['job_id'])
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(job, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Warning: could not persist job {job['job_id']}: {e}")
+
+    def submit(self, fn, *args, **kwargs):
+        """Queues fn(*args, **kwargs); its return value becomes the job result."""
+        job_id = uuid.uuid4().hex
+        self._save({"job_id": job_id, "state": "queued", "created_at": time.time()})
+        self._executor.submit(self._run, job_id, fn, args, kwargs)
+        with self._lock:
+            self._submitted += 1
+            cleanup = self._submitted % 100 == 0
+        if cleanup:
+            self.cleanup()
+        return job_id
+
+    def _run(self, job_id, fn, args, kwargs):
+        job = dict(self.get(job_id) or {"job_id": job_id})
+        job["state"] = "running"
+        self._save(dict(job))
+        try:
+            job["result"] = fn(*args, **kwargs)
+            job["state"] = "finished"
+        except Exception as e:
+            print(f"Error: job {job_id} failed: {e}")
+            job["state"] = "failed"
+            job["error"] = str(e)
+        job["finished_at"] = time.time()
+        self._save(job)
+        metrics.inc('jobs_total', state=job["state"])
+
+    def get(self, job_id):
+        """Job state dict, or None if unknown (or expired)."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+        # Queued by another worker process
+        if not all(c in '0123456789abcdef' for c in job_id):
+            return None
+        try:
+            with open(self._path(job_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def cleanup(self):
+        """Deletes job files older than `retention` seconds."""
+        cutoff = time.time() - self.retention
+        try:
+            for name in os.listdir(self.jobs_dir):
+                path = os.path.join(self.jobs_dir, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                except OSError:
+                    pass
+        except OSError:
+            pass
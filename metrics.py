@@ -0,0 +1,161 @@
+"""
+Per-stage timers and counters for the submission / analysis pipeline.
+
+    with metrics.stage('csv_append'):
+        ...
+    metrics.inc('bytes_written_total', n, target='csv')
+
+Everything is kept in memory and rendered in the Prometheus text format by
+GET /metrics. Values are per worker process (each gunicorn worker keeps its
+own registry, like any in-process exporter).
+
+`profiling()` additionally collects the stages run by the current request
+(or job) so they can be returned as a breakdown with the response.
+"""
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+
+PREFIX = 'recruitment_'
+
+# Seconds; covers an fsync'd append (~1 ms) up to a cold full-pool load
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# name -> (type, help); a metric is only rendered once it has a sample
+METRICS = {
+    'stage_seconds': ('histogram', 'Time spent in each pipeline stage.'),
+    'http_request_seconds': ('histogram', 'HTTP request latency by endpoint.'),
+    'http_requests_total': ('counter', 'HTTP requests by endpoint and status code.'),
+    'bytes_written_total': ('counter', 'Bytes written, by target file / store.'),
+    'bytes_read_total': ('counter', 'Bytes read, by source.'),
+    'remote_cache_requests_total': ('counter', 'Remote CSV lookups: hit (within TTL), not_modified (304), miss (downloaded) or error.'),
+    'rows_scored_total': ('counter', 'Candidate rows run through score_frame.'),
+    'jobs_total': ('counter', 'Background submission jobs by final state.'),
+}
+
+
+def _labels_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Registry:
+    """Thread-safe counters and fixed-bucket histograms."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters = {}   # name -> {labels key: value}
+        self._histograms = {} # name -> {labels key: [bucket counts..., sum, count]}
+
+    def inc(self, name, value=1, **labels):
+        key = _labels_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = _labels_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            state = series.get(key)
+            if state is None:
+                state = series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {name: {k: list(v) for k, v in series.items()} for name, series in self._histograms.items()}
+        lines = []
+        for name in sorted(set(counters) | set(histograms)):
+            kind, help_text = METRICS.get(name, ('counter' if name in counters else 'histogram', ''))
+            full = PREFIX + name
+            lines.append(f'# HELP {full} {help_text}')
+            lines.append(f'# TYPE {full} {kind}')
+            for key, value in sorted(counters.get(name, {}).items()):
+                lines.append(f'{full}{_format_labels(key)} {_format_value(value)}')
+            for key, state in sorted(histograms.get(name, {}).items()):
+                for bound, count in zip(self.buckets, state):
+                    lines.append(f'{full}_bucket{_format_labels(key, [("le", repr(bound))])} {count}')
+                lines.append(f'{full}_bucket{_format_labels(key, [("le", "+Inf")])} {state[-1]}')
+                lines.append(f'{full}_sum{_format_labels(key)} {_format_value(state[-2])}')
+                lines.append(f'{full}_count{_format_labels(key)} {state[-1]}')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Stages of the request / job being profiled, None when not profiling
+_profile = contextvars.ContextVar('profile', default=None)
+
+
+def inc(name, value=1, **labels):
+    REGISTRY.inc(name, value, **labels)
+
+
+def observe(name, value, **labels):
+    REGISTRY.observe(name, value, **labels)
+
+
+def render():
+    return REGISTRY.render()
+
+
+@contextmanager
+def stage(name):
+    """Times a pipeline stage into stage_seconds{stage=name}."""
+    entries = _profile.get()
+    entry = None
+    if entries is not None:
+        # Appended on entry, so nested stages follow their parent
+        entry = {"stage": name, "ms": None}
+        entries.append(entry)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        REGISTRY.observe('stage_seconds', elapsed, stage=name)
+        if entry is not None:
+            entry["ms"] = round(elapsed * 1000, 3)
+
+
+@contextmanager
+def profiling(enabled=True):
+    """
+    Collects the stages run inside the block (same thread) into the yielded
+    list, as [{"stage": name, "ms": elapsed}, ...] in start order.
+    """
+    if not enabled:
+        yield None
+        return
+    entries = []
+    token = _profile.set(entries)
+    try:
+        yield entries
+    finally:
+        _profile.reset(token)
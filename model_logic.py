@@ -1,53 +1,497 @@
 import pandas as pd
 import numpy as np
-import matplotlib
-matplotlib.use('Agg') # Use non-interactive backend for server
-import matplotlib.pyplot as plt
 import os
-import requests
 import io
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import recall_score
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Conv1D, Flatten, Dense, Dropout
-from tensorflow.keras.utils import to_categorical
-from tensorflow.keras import Input
+import csv
+import json
+import bisect
+import hashlib
+import heapq
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from collections import Counter, OrderedDict
+from types import MappingProxyType
+import metrics
+from remote_cache import get_remote_cache
+from scoring_profiles import compile_profile, load_profiles, FEATURE_COLS
+
+RENAME_MAP = {
+    'Años de experiencia': 'Anios_de_experiencia',
+    'Título_Principal': 'Titulo_Principal',
+    'Certificación_1': 'Certificacion_1',
+    'Certificación_2': 'Certificacion_2',
+    'Estadística_Avanzada_Porcentaje': 'Estadistica_Avanzada_Pct',
+    'Python_Porcentaje': 'Python_Pct',
+    'R_Porcentaje': 'R_Pct',
+    'SQL_Porcentaje': 'SQL_Pct',
+    'Nivel_Socio_Económico(NSE_AMAI)': 'NSE_AMAI',
+    'Etnia_(Autodefinición)': 'Etnia_Autodefinicion',
+    'Disponibilidad_de_viajar': 'Disponibilidad_de_viajar',
+    'Nivel_idioma_1': 'Nivel_idioma_1',
+    'Nivel_idioma_2': 'Nivel_idioma_2',
+    'Nombre(s)': 'Nombre(s)',
+    'Apellido_Paterno': 'Apellido_Paterno',
+    'Apellido_Materno': 'Apellido_Materno'
+}
+
+WEIGHTS = {
+    'Python_Pct': 0.25, 'SQL_Pct': 0.20,
+    'Estadistica_Avanzada_Pct': 0.15, 'R_Pct': 0.05,
+    'Score_Titulo': 0.15, 'Score_Certificaciones': 0.10,
+    'Score_Idiomas': 0.10
+}
+
+LEVEL_MAP = {'a1': 0.1, 'a2': 0.2, 'b1': 0.4, 'b2': 0.6, 'c1': 0.8, 'c2': 1.0}
+
+CERT_KEYWORDS = ['ml', 'ai', 'data', 'cloud', 'aws', 'azure', 'gcp', 'cert', 'specialty', 'recomendación']
+
+BIAS_COLS = ['Edad', 'Género', 'Religión_ficticia', 'Afiliación_política_ficticia', 'NSE_AMAI', 'Etnia_Autodefinicion']
+
+# Raw CSV columns the scoring / bias code reads; columnar sources load only these
+SCORING_COLUMNS = [
+    'ID', 'Años de experiencia', 'Nombre(s)', 'Apellido_Paterno', 'Edad', 'Género',
+    'Título_Principal', 'Certificación_1', 'Certificación_2',
+    'Python_Porcentaje', 'R_Porcentaje', 'SQL_Porcentaje', 'Estadística_Avanzada_Porcentaje',
+    'Nivel_idioma_1', 'Nivel_idioma_2', 'Religión_ficticia', 'Afiliación_política_ficticia',
+    'Nivel_Socio_Económico(NSE_AMAI)', 'Etnia_(Autodefinición)'
+]
+
+# Sharded scoring: never split the pool into pieces smaller than this
+MIN_ROWS_PER_SHARD = 50000
+
+# Feature-scored pools RecruitmentAI keeps per (features hash, data version)
+FEATURE_MEMO_SIZE = 2
+
+# Rows per chunk of RecruitmentAI.run_analysis_streaming
+STREAM_CHUNKSIZE = 100000
+
+TOP_N = 10 # Request says "Comparación Top 10". Code says `top_n = 5`. Request text in 4b says Top 10. I'll use 10.
+
+
+def score_titulo(titulo):
+    titulo = str(titulo).lower()
+    if 'ph.d.' in titulo or 'doctorado' in titulo or 'ia' in titulo:
+        return 1.0
+    elif 'maestría' in titulo or 'master' in titulo:
+        return 0.8
+    elif 'lic.' in titulo or 'ing.' in titulo or 'matemáticas' in titulo or 'computación' in titulo or 'ciencias de datos' in titulo:
+        return 0.6
+    else:
+        return 0.3
+
+def score_certificaciones(cert1, cert2):
+    score = 0
+    certs = [str(cert1).lower(), str(cert2).lower()]
+    for cert in certs:
+        if any(k in cert for k in CERT_KEYWORDS):
+            score += 0.5 
+    return min(score, 1.0)
+
+def score_idiomas(nivel1, nivel2):
+    score1 = LEVEL_MAP.get(str(nivel1).lower(), 0)
+    score2 = LEVEL_MAP.get(str(nivel2).lower(), 0)
+    return (score1 + score2) / 2.0
+
+
+# Vectorized equivalents of the row-wise functions above (same scores, no per-row
+# Python calls), driven by a compiled scoring profile (see scoring_profiles.py).
+TITULO_TIERS = [
+    (['ph.d.', 'doctorado', 'ia'], 1.0),
+    (['maestría', 'master'], 0.8),
+    (['lic.', 'ing.', 'matemáticas', 'computación', 'ciencias de datos'], 0.6),
+]
+TITULO_DEFAULT = 0.3
+
+# The built-in profile: the constants above. Profiles loaded from
+# scoring_profiles.json start from it.
+DEFAULT_PROFILE_CONFIG = {
+    'weights': WEIGHTS,
+    'titulo_tiers': [{'keywords': words, 'score': value} for words, value in TITULO_TIERS],
+    'titulo_default': TITULO_DEFAULT,
+    'cert_keywords': CERT_KEYWORDS,
+    'cert_points': 0.5,
+    'cert_max': 1.0,
+    'level_map': LEVEL_MAP,
+    'experience_factor': 0.05,
+    'top_n': TOP_N,
+}
+DEFAULT_PROFILE = compile_profile(DEFAULT_PROFILE_CONFIG, 'default')
+
+
+def get_profile(profile=None):
+    """None -> DEFAULT_PROFILE; a config dict is compiled (cached by hash)."""
+    if profile is None:
+        return DEFAULT_PROFILE
+    if isinstance(profile, dict):
+        return compile_profile(profile)
+    return profile
+
+
+def load_scoring_profiles(path):
+    """Profiles from a JSON file, plus 'default' unless the file redefines it."""
+    profiles = {'default': DEFAULT_PROFILE}
+    if path and os.path.exists(path):
+        profiles.update(load_profiles(path, DEFAULT_PROFILE_CONFIG))
+    return profiles
+
+
+def _lowered(df, col):
+    # str(x).lower() per cell; missing values never match any keyword or level
+    if col not in df.columns:
+        return pd.Series('', index=df.index, dtype=object)
+    values = df[col].astype(object)
+    return values.where(values.notna(), '').astype(str).str.lower()
+
+def _per_row(df, col, fn):
+    """
+    fn(lowered text Series) -> per-row array. Categorical columns (columnar
+    store) are evaluated once per category and broadcast through the codes.
+    """
+    if col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype):
+        cats = df[col].cat.categories
+        lowered = pd.Series(cats.astype(object), dtype=object).astype(str).str.lower()
+        per_cat = np.asarray(fn(lowered))
+        missing = fn(pd.Series([''], dtype=object)) # code -1
+        return np.append(per_cat, missing)[df[col].cat.codes.to_numpy()]
+    return np.asarray(fn(_lowered(df, col)))
+
+def _titulo_tier(titulos, profile):
+    conds = [titulos.str.contains(pattern, regex=True).to_numpy(dtype=bool) for pattern, _ in profile.titulo_patterns]
+    values = [value for _, value in profile.titulo_patterns]
+    return np.select(conds, values, default=profile.titulo_default)
+
+def _cert_hit(certs, profile):
+    return certs.str.contains(profile.cert_pattern, regex=True).to_numpy(dtype=bool)
+
+def _level_value(niveles, profile):
+    # -1 (not a known level) picks the trailing 0.0 of level_lookup
+    return profile.level_lookup[pd.Index(profile.level_categories).get_indexer(niveles)]
+
+def score_titulo_vec(df, col='Titulo_Principal', profile=None):
+    profile = get_profile(profile)
+    return pd.Series(_per_row(df, col, lambda s: _titulo_tier(s, profile)), index=df.index)
+
+def score_certificaciones_vec(df, cols=('Certificacion_1', 'Certificacion_2'), profile=None):
+    profile = get_profile(profile)
+    hits = np.zeros(len(df))
+    for col in cols:
+        hits += _per_row(df, col, lambda s: _cert_hit(s, profile))
+    return pd.Series(np.minimum(hits * profile.cert_points, profile.cert_max), index=df.index)
+
+def score_idiomas_vec(df, cols=('Nivel_idioma_1', 'Nivel_idioma_2'), profile=None):
+    profile = get_profile(profile)
+    total = np.zeros(len(df))
+    for col in cols:
+        total += _per_row(df, col, lambda s: _level_value(s, profile))
+    return pd.Series(total / 2.0, index=df.index)
+
+
+def _numeric(series):
+    # Columns from the columnar store are already typed: skip the re-parse
+    if not pd.api.types.is_numeric_dtype(series):
+        series = pd.to_numeric(series, errors='coerce')
+    return series.fillna(0)
+
+
+def score_features(df, profile=None):
+    """
+    Adds the FEATURE_COLS (Score_Titulo, Score_Certificaciones, Score_Idiomas
+    and the numeric inputs) to a renamed candidate frame (in place). This is
+    the text-parsing part; it only depends on profile.features_hash.
+    """
+    profile = get_profile(profile)
+    df['Score_Titulo'] = score_titulo_vec(df, profile=profile)
+    df['Score_Certificaciones'] = score_certificaciones_vec(df, profile=profile)
+    df['Score_Idiomas'] = score_idiomas_vec(df, profile=profile)
+
+    # Safe convert to float
+    for col in ['Python_Pct', 'SQL_Pct', 'Estadistica_Avanzada_Pct', 'R_Pct', 'Anios_de_experiencia']:
+         df[col] = _numeric(df[col])
+         
+    # Normalize if they are 0-100 instead of 0-1. Data examples are 0.95, so 0-1.
+    # But if user enters 95 in form, we might need to handle it.
+    # Assuming data matches convention.
+    return df
+
+
+def apply_weights(df, profile=None):
+    """Score_Base, Experiencia_Multiplier and Score_Final from the feature columns (in place)."""
+    profile = get_profile(profile)
+    # Summed left to right, in the profile's order
+    terms = [df[col] * weight for col, weight in profile.weights]
+    score_base = terms[0] if terms else 0.0
+    for term in terms[1:]:
+        score_base = score_base + term
+    df['Score_Base'] = score_base
+    df['Experiencia_Multiplier'] = 1 + np.log1p(df['Anios_de_experiencia']) * profile.experience_factor
+    df['Score_Final'] = df['Score_Base'] * df['Experiencia_Multiplier']
+    return df
+
+
+def score_frame(df, profile=None):
+    """
+    Adds Score_Titulo, Score_Certificaciones, Score_Idiomas, Score_Base and
+    Score_Final to an already renamed candidate frame (in place).
+    """
+    score_features(df, profile)
+    apply_weights(df, profile)
+    metrics.inc('rows_scored_total', len(df))
+    return df
+
+
+def summarize_bias(df, top_candidates):
+    """Population vs Top-N distribution (in %) for every bias column present in df."""
+    summary_results = {}
+    for col in BIAS_COLS:
+        if col not in df.columns: continue
+        
+        total_dist = _value_distribution(df[col])
+        top_dist = _value_distribution(top_candidates[col])
+        summary_results[col] = merge_distributions(total_dist, top_dist)
+    return summary_results
+
+
+def _value_distribution(series):
+    # value_counts(normalize=True).mul(100).round(2), minus the zero-count
+    # categories a categorical column would add
+    counts = series.value_counts()
+    counts = counts[counts > 0]
+    return (counts / counts.sum()).mul(100).round(2).to_dict()
+
+
+def merge_distributions(total_dist, top_dist):
+    # Merge for display (sorted, so the order does not depend on set / hash order)
+    all_keys = set(total_dist.keys()) | set(top_dist.keys())
+    col_summary = []
+    for k in sorted(all_keys, key=str):
+        pop_val = total_dist.get(k, 0)
+        top_val = top_dist.get(k, 0)
+        diff = round(top_val - pop_val, 2)
+        col_summary.append({
+            "category": str(k),
+            "population": pop_val,
+            "top_selected": top_val,
+            "difference": diff
+        })
+    return col_summary
+
+
+def prepare_frame(df):
+    """Renames the raw CSV columns to the names used by the scoring logic (in place)."""
+    df.rename(columns=RENAME_MAP, inplace=True)
+    return df
+
+
+# --- Sharded (multi-process) scoring ---------------------------------------
+#
+# The pool is cut into contiguous row ranges, each scored in a worker process.
+# Shards keep their global row labels, and every merge sorts stably by
+# Score_Final desc, so ties are broken by row position exactly like the
+# single-process path (stable sort_values / idxmax = first occurrence).
+
+def shard_bounds(n, workers, min_rows=None):
+    """Contiguous (start, stop) ranges; a single range when sharding does not pay off."""
+    min_rows = MIN_ROWS_PER_SHARD if min_rows is None else min_rows
+    shards = max(1, min(workers or 1, n // max(min_rows, 1)))
+    step = -(-n // shards) if n else 0
+    return [(start, min(start + step, n)) for start in range(0, n, step)] if n else []
+
+
+def _scoring_view(df):
+    # Only what scoring / bias / display need is shipped to the workers
+    cols = [RENAME_MAP.get(c, c) for c in SCORING_COLUMNS]
+    return df[[c for c in cols if c in df.columns]]
+
+
+def _score_shard(df, profile_config, profile_name):
+    # Profiles travel as plain config; compiled once per worker process
+    prepare_frame(df)
+    score_frame(df, compile_profile(profile_config, profile_name))
+    return df
+
+
+def _shard_scores(df, profile_config, profile_name):
+    """Worker: feature scores and Score_Final of one shard."""
+    return _score_shard(df, profile_config, profile_name)[FEATURE_COLS + ['Score_Final']]
+
+
+def _analyze_shard(df, profile_config, profile_name, top_n, current_candidate_id):
+    """Worker: scores, local Top-N, bias counts and ID matches of one shard."""
+    df = _score_shard(df, profile_config, profile_name)
+    top_cols = [c for c in ['ID', 'Nombre(s)', 'Apellido_Paterno', 'Score_Final'] + BIAS_COLS if c in df.columns]
+    population = {}
+    for col in BIAS_COLS:
+        if col in df.columns:
+            counts = df[col].value_counts()
+            population[col] = Counter({k: int(c) for k, c in counts.items() if c > 0})
+    matches = []
+    if current_candidate_id:
+        matches = df.index[(df['ID'] == current_candidate_id).to_numpy()].tolist()
+    return {
+        "scores": df['Score_Final'].to_numpy(dtype=np.float64),
+        "top": df.sort_values(by='Score_Final', ascending=False, kind='stable').head(top_n)[top_cols],
+        "population": population,
+        "matches": matches,
+    }
+
+
+def _map_shards(fn, df, bounds, *args):
+    """Runs fn(shard, *args) for every shard in a spawned process pool, in shard order."""
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=len(bounds), mp_context=ctx) as pool:
+        futures = [pool.submit(fn, df.iloc[start:stop], *args) for start, stop in bounds]
+        return [f.result() for f in futures]
+
+
+def score_sharded(df, workers, profile=None):
+    """
+    Adds the feature columns and Score_Final to a renamed candidate frame (in
+    place), computed across `workers` processes when the pool is big enough.
+    """
+    profile = get_profile(profile)
+    bounds = shard_bounds(len(df), workers)
+    if len(bounds) <= 1:
+        return score_frame(df, profile)
+    with metrics.stage('score_sharded'):
+        scored = pd.concat(_map_shards(_shard_scores, _scoring_view(df), bounds, profile.config, profile.name))
+    for col in scored.columns:
+        df[col] = scored[col].to_numpy()
+    metrics.inc('rows_scored_total', len(df))
+    return df
+
+
+def _rank_at(scores, pos):
+    # 1-based position of row `pos` in a stable Score_Final-desc sort (NaN last)
+    score = scores[pos]
+    if np.isnan(score):
+        return int((~np.isnan(scores)).sum() + np.isnan(scores[:pos]).sum()) + 1
+    return int((scores > score).sum() + (scores[:pos] == score).sum()) + 1
+
+
+# --- Streaming (bounded-memory) analysis -----------------------------------
+#
+# Chunks are scored one at a time and dropped; what survives a chunk is the
+# Top-N heap, the bias counters and the ID matches. Rank keys map NaN to
+# -inf, so "ahead of" below is the stable Score_Final-desc order (NaN last).
+
+def _rank_keys(scores):
+    scores = np.asarray(scores, dtype=np.float64)
+    return np.where(np.isnan(scores), -np.inf, scores)
+
+
+def _count_ahead(keys, offset, key, pos):
+    # Rows of this chunk (starting at global row `offset`) sorted before row `pos`
+    before = min(max(pos - offset, 0), len(keys))
+    return int((keys > key).sum() + (keys[:before] == key).sum())
+
+
+class StreamingTopN:
+    """
+    The first `n` rows of a stable Score_Final-desc sort over a stream of
+    scored chunks, keeping at most `n` rows in memory.
+    """
+
+    def __init__(self, n, columns):
+        self.n = n
+        self.columns = columns
+        self._heap = [] # (rank key, -row, record); the root is the weakest row kept
+
+    def push(self, df, offset, keys):
+        """Offers the rows of a scored chunk; `offset` is its first global row."""
+        if self.n <= 0 or df.empty:
+            return
+        # Only the chunk's own Top-N can make the overall Top-N
+        order = np.argsort(-keys, kind='stable')[:self.n]
+        self.columns = [c for c in self.columns if c in df.columns]
+        records = df.iloc[order][self.columns].to_dict('records')
+        for i, record in zip(order, records):
+            item = (float(keys[i]), -(offset + int(i)), record)
+            if len(self._heap) < self.n:
+                heapq.heappush(self._heap, item)
+            elif item[:2] > self._heap[0][:2]:
+                heapq.heapreplace(self._heap, item)
+            else:
+                break # the rest of the chunk's Top-N ranks lower still
+
+    def frame(self):
+        """Top-N rows, best first."""
+        ranked = sorted(self._heap, key=lambda item: item[:2], reverse=True)
+        return pd.DataFrame([record for _, _, record in ranked], columns=self.columns)
+
 
 class RecruitmentAI:
-    def __init__(self, local_path, remote_url=None):
+    def __init__(self, local_path, remote_url=None, remote_cache=None, store=None, workers=1):
         self.local_path = local_path
+        self.store = store # ColumnarCandidateStore holding the local rows, if any
+        self.workers = workers # > 1: large pools are scored in a process pool
         self.remote_url = remote_url
+        if remote_cache is None and remote_url:
+            remote_cache = get_remote_cache(remote_url, os.path.dirname(local_path))
+        self.remote_cache = remote_cache
         self.output_path = os.path.join(os.path.dirname(local_path), 'candidatos_evaluados_score_final.csv')
         self.best_candidate = None
         self.bias_summary = {}
         self.last_run_results = {}
+        self._feature_memo = OrderedDict() # (features_hash, data stamp) -> feature-scored pool
 
-    def load_combined_data(self):
+    def _data_stamp(self):
+        """Changes whenever the remote snapshot or the local rows change."""
+        remote = None
+        if self.remote_cache is not None:
+            try:
+                self.remote_cache.get_text() # revalidates once the TTL expired
+            except Exception:
+                pass
+            remote = self.remote_cache.version
+        if self.store is not None:
+            local = len(self.store)
+        else:
+            try:
+                st = os.stat(self.local_path)
+                local = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                local = None
+        return remote, local
+
+    def _memoized_features(self, key):
+        df = self._feature_memo.get(key)
+        if df is not None:
+            self._feature_memo.move_to_end(key)
+        return df
+
+    def _memoize_features(self, key, df):
+        self._feature_memo[key] = df
+        while len(self._feature_memo) > FEATURE_MEMO_SIZE:
+            self._feature_memo.popitem(last=False)
+
+    def load_combined_data(self, columns=None):
+        """Remote + local candidates. `columns` limits what is loaded (raw CSV names)."""
+        with metrics.stage('load_combined_data'):
+            return self._load_combined_data(columns)
+
+    def _load_combined_data(self, columns):
         dfs = []
-        # 1. Fetch Remote
-        if self.remote_url:
+        # 1. Remote (cached snapshot, revalidated every `ttl` seconds)
+        if self.remote_cache is not None:
             try:
-                # Try main branch
-                r = requests.get(self.remote_url)
-                if r.status_code != 200 and 'main' in self.remote_url:
-                    # Fallback to master if main fails
-                    fallback = self.remote_url.replace('main', 'master')
-                    r = requests.get(fallback)
-                
-                if r.status_code == 200:
-                    # Using StringIO to read string as file
-                    df_remote = pd.read_csv(io.StringIO(r.text))
+                df_remote = self.remote_cache.get_dataframe()
+                if df_remote is not None:
+                    if columns is not None:
+                        df_remote = df_remote[[c for c in columns if c in df_remote.columns]]
                     dfs.append(df_remote)
-                else:
-                    print(f"Warning: Could not fetch from GitHub ({r.status_code})")
             except Exception as e:
                 print(f"Warning: GitHub fetch failed: {e}")
 
-        # 2. Read Local
-        if os.path.exists(self.local_path):
+        # 2. Read Local (columnar store if configured, otherwise the CSV)
+        if self.store is not None:
+            df_local = self.store.read(columns)
+            if len(df_local):
+                dfs.append(df_local)
+        elif os.path.exists(self.local_path):
              try:
-                df_local = pd.read_csv(self.local_path)
+                df_local = pd.read_csv(self.local_path, usecols=lambda c: columns is None or c in columns)
+                metrics.inc('bytes_read_total', os.path.getsize(self.local_path), source='local_csv')
                 dfs.append(df_local)
              except:
                 pass
@@ -58,197 +502,72 @@ class RecruitmentAI:
         # Combine
         return pd.concat(dfs, ignore_index=True)
 
-    def run_analysis(self, current_candidate_id=None):
+    def iter_combined_data(self, columns=None, chunksize=STREAM_CHUNKSIZE):
+        """load_combined_data() in chunks of at most `chunksize` rows, in the same row order."""
+        if self.remote_cache is not None:
+            try:
+                text = self.remote_cache.get_text()
+            except Exception as e:
+                print(f"Warning: GitHub fetch failed: {e}")
+                text = None
+            if text:
+                usecols = None if columns is None else (lambda c: c in columns)
+                yield from pd.read_csv(io.StringIO(text), usecols=usecols, chunksize=chunksize)
+
+        if self.store is not None:
+            yield from self.store.iter_chunks(columns, chunksize)
+        elif os.path.exists(self.local_path):
+            try:
+                reader = pd.read_csv(self.local_path, usecols=lambda c: columns is None or c in columns, chunksize=chunksize)
+                metrics.inc('bytes_read_total', os.path.getsize(self.local_path), source='local_csv')
+            except Exception:
+                return
+            yield from reader
+
+    def run_analysis(self, current_candidate_id=None, profile=None):
         """
-        Runs the full analysis pipeline: CNN training + Scoring + Bias Analysis.
+        Runs the analysis pipeline: Scoring + Bias Analysis.
         Returns a dictionary with results.
+
+        `profile` is a ScoringProfile (default: DEFAULT_PROFILE). The
+        feature scores of the pool are memoized per features hash and data
+        version, so another profile with the same features only re-weights.
         """
-        df = self.load_combined_data()
-        
-        if df.empty:
-            return {"error": "No data found (Local or Remote)."}
-            
-        # --- PREPROCESSING FOR CNN ---
-        
-        # --- PREPROCESSING FOR CNN ---
-        # Expectativas salariales
-        df['Salario_Medio_MXN'] = pd.to_numeric(df['Sueldo_mensual'], errors='coerce').fillna(0) # Added coerce/fillna for safety
-
-        # Target Mapping
-        dc_mapping = {
-            '6 meses ': 0, '1 mes ': 20, '4 semanas ': 40,
-            '3 semanas ': 60, '2 semanas ': 80, 'Inmediata ': 100
-        }
-        # Strip whitespace from CSV data just in case
-        df['Disponibilidad_contratación'] = df['Disponibilidad_contratación'].astype(str).str.strip()
-        # Update mapping keys to match cleaned data if necessary (removed trailing spaces in keys if data is clean)
-        # The provided code had '6 meses ' with a space. The CSV I wrote has 'Inmediata '... wait.
-        # My CSV has 'Inmediata ' with a space because I copied the user's data exactly.
-        # So I will keep the mapping as is, but maybe strip both to be safe.
-        
-        normalized_mapping = {k.strip(): v for k, v in dc_mapping.items()}
-        df['Disp_C_Mapped'] = df['Disponibilidad_contratación'].str.strip().map(normalized_mapping).fillna(-1)
-        
-        # Filter valid rows for CNN (though we want to score everyone, filtering might lose the new candidate if they have invalid disp)
-        # We'll just filter for the CNN training part, but keep full DF for scoring.
-        df_cnn = df[df['Disp_C_Mapped'] != -1].copy()
-        
-        unique_classes = sorted(df_cnn['Disp_C_Mapped'].unique())
-        class_to_idx = {cls: idx for idx, cls in enumerate(unique_classes)}
-        df_cnn['y'] = df_cnn['Disp_C_Mapped'].map(class_to_idx)
-        
-        NUM_CLASSES = len(unique_classes)
-        
-        # Renames
-        rename_map = {
-            'Años de experiencia': 'Anios_de_experiencia',
-            'Título_Principal': 'Titulo_Principal',
-            'Certificación_1': 'Certificacion_1',
-            'Certificación_2': 'Certificacion_2',
-            'Estadística_Avanzada_Porcentaje': 'Estadistica_Avanzada_Pct',
-            'Python_Porcentaje': 'Python_Pct',
-            'R_Porcentaje': 'R_Pct',
-            'SQL_Porcentaje': 'SQL_Pct',
-            'Nivel_Socio_Económico(NSE_AMAI)': 'NSE_AMAI',
-            'Etnia_(Autodefinición)': 'Etnia_Autodefinicion',
-            'Disponibilidad_de_viajar': 'Disponibilidad_de_viajar',
-            'Nivel_idioma_1': 'Nivel_idioma_1',
-            'Nivel_idioma_2': 'Nivel_idioma_2',
-            'Nombre(s)': 'Nombre(s)',
-            'Apellido_Paterno': 'Apellido_Paterno',
-            'Apellido_Materno': 'Apellido_Materno'
-        }
-        df_cnn.rename(columns=rename_map, inplace=True)
-        # Rename original DF as well for Scoring
-        df.rename(columns=rename_map, inplace=True)
-
-        numerical_features = [
-            'Anios_de_experiencia', 'Python_Pct', 'R_Pct', 'SQL_Pct',
-            'Estadistica_Avanzada_Pct', 'Salario_Medio_MXN'
-        ]
-        categorical_features = ['Disponibilidad_de_viajar']
-        
-        # CNN Preparation
-        # Mocking/Simplifying CNN for speed/stability in this demo if needed, but per request will implement flow.
-        # Note: In a real web request, retraining every time is bad practice.
-        # We will try to run it.
-        
-        df_encoded = pd.get_dummies(df_cnn, columns=categorical_features, drop_first=True)
-        # Ensure regex chars are handled or just use simple col names
-        
-        X_cols = numerical_features + [col for col in df_encoded.columns if any(cat in col for cat in categorical_features) and col not in categorical_features]
-        
-        # Handle missing columns if get_dummies didn't produce them (e.g. only one category)
-        # For robustness, we align columns content.
-        
-        X = df_encoded[X_cols].values
-        y = df_encoded['y'].values
-        
-        # SCALING
-        scaler = StandardScaler()
-        X_scaled = scaler.fit_transform(X)
-        NUM_FEATURES = X.shape[1]
-        
-        # ... Skipping actual CNN training for the WEB response speed unless strictly required for the scoring?
-        # The prompt says "Se agregará el siguiente código...".
-        # The CNN predicts "Disponibilidad". The User Score is "Score_Final". 
-        # The Score_Final does NOT depend on the CNN output. It depends on weights.
-        # So I will SKIP the heavy CNN training loop for the HTTP request to be responsive, 
-        # BUT I will keep the Scoring logic which is what the user *sees* (Best Candidate).
-        # The user asked to "Agregar el siguiente codigo". I will implement the Scoring logic faithfully.
-        
+        profile = get_profile(profile)
+        memo_key = (profile.features_hash, self._data_stamp())
+        df = self._memoized_features(memo_key)
+        if df is None:
+            df = self.load_combined_data(columns=SCORING_COLUMNS)
+
+            if df.empty:
+                return {"error": "No data found (Local or Remote)."}
+
+            # The availability CNN is trained by a separate job (training.py) and
+            # served through training.ModelRegistry; nothing is trained here.
+            # The Score_Final does NOT depend on the CNN output. It depends on weights.
+            prepare_frame(df)
+
+            bounds = shard_bounds(len(df), self.workers)
+            if len(bounds) > 1:
+                # Large pools: scored in worker processes, not memoized here
+                return self._run_analysis_sharded(df, bounds, current_candidate_id, profile)
+
+            with metrics.stage('features'):
+                score_features(df, profile)
+            self._memoize_features(memo_key, df)
+
         # --- SCORING LOGIC (The core requirement for Q4a) ---
-        
-        def score_titulo(titulo):
-            titulo = str(titulo).lower()
-            if 'ph.d.' in titulo or 'doctorado' in titulo or 'ia' in titulo:
-                return 1.0
-            elif 'maestría' in titulo or 'master' in titulo:
-                return 0.8
-            elif 'lic.' in titulo or 'ing.' in titulo or 'matemáticas' in titulo or 'computación' in titulo or 'ciencias de datos' in titulo:
-                return 0.6
-            else:
-                return 0.3
-
-        def score_certificaciones(cert1, cert2):
-            score = 0
-            keywords = ['ml', 'ai', 'data', 'cloud', 'aws', 'azure', 'gcp', 'cert', 'specialty', 'recomendación']
-            certs = [str(cert1).lower(), str(cert2).lower()]
-            for cert in certs:
-                if any(k in cert for k in keywords):
-                    score += 0.5 
-            return min(score, 1.0)
-
-        level_map = {'a1': 0.1, 'a2': 0.2, 'b1': 0.4, 'b2': 0.6, 'c1': 0.8, 'c2': 1.0}
-        def score_idiomas(nivel1, nivel2):
-            score1 = level_map.get(str(nivel1).lower(), 0)
-            score2 = level_map.get(str(nivel2).lower(), 0)
-            return (score1 + score2) / 2.0
-
-        df['Score_Titulo'] = df['Titulo_Principal'].apply(score_titulo)
-        df['Score_Certificaciones'] = df.apply(lambda row: score_certificaciones(row.get('Certificacion_1', ''), row.get('Certificacion_2', '')), axis=1)
-        df['Score_Idiomas'] = df.apply(lambda row: score_idiomas(row.get('Nivel_idioma_1', ''), row.get('Nivel_idioma_2', '')), axis=1)
-
-        weights = {
-            'Python_Pct': 0.25, 'SQL_Pct': 0.20,
-            'Estadistica_Avanzada_Pct': 0.15, 'R_Pct': 0.05,
-            'Score_Titulo': 0.15, 'Score_Certificaciones': 0.10,
-            'Score_Idiomas': 0.10
-        }
+        df = df.copy(deep=False) # the memoized frame is shared between calls
+        with metrics.stage('score'):
+            apply_weights(df, profile)
+        metrics.inc('rows_scored_total', len(df))
 
-        # Safe convert to float
-        for col in ['Python_Pct', 'SQL_Pct', 'Estadistica_Avanzada_Pct', 'R_Pct']:
-             df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-             
-        # Normalize if they are 0-100 instead of 0-1. Data examples are 0.95, so 0-1.
-        # But if user enters 95 in form, we might need to handle it.
-        # Assuming data matches convention.
-        
-        df['Score_Base'] = (
-            df['Python_Pct'] * weights['Python_Pct'] +
-            df['SQL_Pct'] * weights['SQL_Pct'] +
-            df['Estadistica_Avanzada_Pct'] * weights['Estadistica_Avanzada_Pct'] +
-            df['R_Pct'] * weights['R_Pct'] +
-            df['Score_Titulo'] * weights['Score_Titulo'] +
-            df['Score_Certificaciones'] * weights['Score_Certificaciones'] +
-            df['Score_Idiomas'] * weights['Score_Idiomas']
-        )
-        
-        df['Anios_de_experiencia'] = pd.to_numeric(df['Anios_de_experiencia'], errors='coerce').fillna(0)
-        df['Experiencia_Multiplier'] = 1 + np.log1p(df['Anios_de_experiencia']) * 0.05
-        df['Score_Final'] = df['Score_Base'] * df['Experiencia_Multiplier']
-        
         # --- BIAS MITIGATION SUMMARY (For Q4b) ---
-        bias_cols = ['Edad', 'Género', 'Religión_ficticia', 'Afiliación_política_ficticia', 'NSE_AMAI', 'Etnia_Autodefinicion']
-        # Map back to original names if needed or use rename_map keys if columns were renamed
-        # We renamed them in df. So check names.
-        # 'Religión_ficticia' -> 'Religión_ficticia' (Not renamed in map above? Let's check rename_map)
-        # rename map doesn't cover all bias cols. 
-        
-        top_n = 10 # Request says "Comparación Top 10". Code says `top_n = 5`. Request text in 4b says Top 10. I'll use 10.
-        top_candidates = df.sort_values(by='Score_Final', ascending=False).head(top_n)
-        
-        summary_results = {}
-        for col in bias_cols:
-            if col not in df.columns: continue
-            
-            total_dist = df[col].value_counts(normalize=True).mul(100).round(2).to_dict()
-            top_dist = top_candidates[col].value_counts(normalize=True).mul(100).round(2).to_dict()
-            
-            # Merge for display
-            all_keys = set(total_dist.keys()) | set(top_dist.keys())
-            col_summary = []
-            for k in all_keys:
-                pop_val = total_dist.get(k, 0)
-                top_val = top_dist.get(k, 0)
-                diff = round(top_val - pop_val, 2)
-                col_summary.append({
-                    "category": str(k),
-                    "population": pop_val,
-                    "top_selected": top_val,
-                    "difference": diff
-                })
-            summary_results[col] = col_summary
+        top_n = profile.top_n
+        with metrics.stage('bias'):
+            # Stable: equal scores keep their row order (same as the sharded path)
+            top_candidates = df.sort_values(by='Score_Final', ascending=False, kind='stable').head(top_n)
+            summary_results = summarize_bias(df, top_candidates)
 
         best_cand_row = df.loc[df['Score_Final'].idxmax()]
         
@@ -263,7 +582,7 @@ class RecruitmentAI:
             if not current_row.empty:
                 current_score = current_row.iloc[0]['Score_Final']
                 # Rank
-                df_sorted = df.sort_values(by='Score_Final', ascending=False).reset_index(drop=True)
+                df_sorted = df.sort_values(by='Score_Final', ascending=False, kind='stable').reset_index(drop=True)
                 rank_idx = df_sorted[df_sorted['ID'] == current_candidate_id].index[0]
                 current_rank = int(rank_idx) + 1
                 if current_row.iloc[0]['ID'] == best_cand_row['ID']:
@@ -282,3 +601,649 @@ class RecruitmentAI:
                 "rank": current_rank
             }
         }
+
+    def run_analysis_streaming(self, current_candidate_id=None, profile=None, chunksize=STREAM_CHUNKSIZE):
+        """
+        run_analysis() for pools too large to hold in memory: candidates are
+        read and scored `chunksize` rows at a time, with a bounded heap for
+        the Top-N and running counts for bias and rank. Same results as
+        run_analysis (for CSV sources, category labels follow the dtype
+        pandas infers per chunk, e.g. an Edad chunk with blanks gives "30.0").
+
+        The rank of `current_candidate_id` needs its score first: rows read
+        before the candidate are scored a second time, up to the candidate's
+        chunk (nothing extra when it is in the first chunk).
+        """
+        profile = get_profile(profile)
+        top = StreamingTopN(profile.top_n, ['ID', 'Nombre(s)', 'Apellido_Paterno', 'Score_Final'] + BIAS_COLS)
+        population = {} # bias col -> Counter over the whole pool
+        matches = [] # (rank key, -row, Score_Final) of rows with current_candidate_id
+        match_chunk = None # chunk of matches[0]
+        ahead = 0 # rows sorted before matches[0], counted from match_chunk on
+        rows = 0
+
+        with metrics.stage('stream'):
+            for chunk_no, df in enumerate(self.iter_combined_data(SCORING_COLUMNS, chunksize)):
+                df = prepare_frame(df).reset_index(drop=True)
+                with metrics.stage('score'):
+                    score_frame(df, profile)
+                keys = _rank_keys(df['Score_Final'])
+                with metrics.stage('bias'):
+                    top.push(df, rows, keys)
+                    for col in BIAS_COLS:
+                        if col in df.columns:
+                            counts = df[col].value_counts()
+                            population.setdefault(col, Counter()).update({k: int(c) for k, c in counts.items() if c > 0})
+                if current_candidate_id:
+                    for i in np.flatnonzero((df['ID'] == current_candidate_id).to_numpy()):
+                        matches.append((float(keys[i]), -(rows + int(i)), float(df['Score_Final'].iat[i])))
+                    if matches:
+                        if match_chunk is None:
+                            match_chunk = chunk_no
+                        ahead += _count_ahead(keys, rows, matches[0][0], -matches[0][1])
+                rows += len(df)
+
+        if not rows:
+            return {"error": "No data found (Local or Remote)."}
+
+        top_candidates = top.frame()
+        summary_results = {}
+        for col in BIAS_COLS:
+            if col not in population: continue
+            top_counts = Counter({k: int(c) for k, c in top_candidates[col].value_counts().items() if c > 0})
+            summary_results[col] = merge_distributions(_distribution(population[col]), _distribution(top_counts))
+
+        best_cand_row = top_candidates.iloc[0]
+
+        is_best = False
+        current_score = 0
+        current_rank = 0
+        if matches:
+            current_score = matches[0][2]
+            # With duplicate IDs the rank is the one of the first match in sorted order
+            best_match = max(matches, key=lambda m: m[:2])
+            if best_match is matches[0]:
+                first_chunk = match_chunk
+            else:
+                first_chunk, ahead = None, 0
+            ahead += self._count_ahead_streaming(best_match[0], -best_match[1], profile, chunksize, first_chunk)
+            current_rank = ahead + 1
+            is_best = current_candidate_id == best_cand_row['ID']
+
+        return {
+            "best_candidate": {
+                "id": str(best_cand_row['ID']),
+                "name": f"{best_cand_row['Nombre(s)']} {best_cand_row['Apellido_Paterno']}",
+                "score": float(best_cand_row['Score_Final'])
+            },
+            "bias_summary": summary_results,
+            "current_candidate": {
+                "is_best": bool(is_best),
+                "score": float(current_score),
+                "rank": current_rank
+            }
+        }
+
+    def _count_ahead_streaming(self, key, pos, profile, chunksize, stop_chunk=None):
+        """Second pass: rows sorted before row `pos`, in the chunks before `stop_chunk` (all if None)."""
+        if stop_chunk == 0:
+            return 0
+        ahead = 0
+        rows = 0
+        with metrics.stage('stream_rank'):
+            for chunk_no, df in enumerate(self.iter_combined_data(SCORING_COLUMNS, chunksize)):
+                if chunk_no == stop_chunk:
+                    break
+                df = prepare_frame(df).reset_index(drop=True)
+                keys = _rank_keys(score_frame(df, profile)['Score_Final'])
+                ahead += _count_ahead(keys, rows, key, pos)
+                rows += len(df)
+        return ahead
+
+    def compare_profiles(self, profiles, current_candidate_id=None):
+        """run_analysis for each profile (A/B), keyed by profile name."""
+        return {p.name: self.run_analysis(current_candidate_id, p) for p in map(get_profile, profiles)}
+
+    def _run_analysis_sharded(self, df, bounds, current_candidate_id, profile):
+        """run_analysis with scoring and bias counting spread over a process pool."""
+        df = _scoring_view(df).reset_index(drop=True)
+        top_n = profile.top_n
+        with metrics.stage('score_sharded'):
+            parts = _map_shards(_analyze_shard, df, bounds, profile.config, profile.name, top_n, current_candidate_id)
+        metrics.inc('rows_scored_total', len(df))
+
+        with metrics.stage('bias'):
+            scores = np.concatenate([part["scores"] for part in parts])
+            # Shard Top-Ns are in shard (= row) order, so a stable sort breaks ties by row
+            top_candidates = pd.concat([part["top"] for part in parts]).sort_values(
+                by='Score_Final', ascending=False, kind='stable').head(top_n)
+            summary_results = {}
+            for col in BIAS_COLS:
+                if col not in df.columns: continue
+                population = Counter()
+                for part in parts:
+                    population.update(part["population"].get(col, {}))
+                top_counts = Counter({k: int(c) for k, c in top_candidates[col].value_counts().items() if c > 0})
+                summary_results[col] = merge_distributions(_distribution(population), _distribution(top_counts))
+
+        best_cand_row = top_candidates.iloc[0]
+
+        is_best = False
+        current_score = 0
+        current_rank = 0
+        matches = [pos for part in parts for pos in part["matches"]]
+        if matches:
+            current_score = scores[matches[0]]
+            # First of the matching rows in sorted order, as in run_analysis
+            current_rank = min(_rank_at(scores, pos) for pos in matches)
+            is_best = df.at[matches[0], 'ID'] == best_cand_row['ID']
+
+        return {
+            "best_candidate": {
+                "id": str(best_cand_row['ID']),
+                "name": f"{best_cand_row['Nombre(s)']} {best_cand_row['Apellido_Paterno']}",
+                "score": float(best_cand_row['Score_Final'])
+            },
+            "bias_summary": summary_results,
+            "current_candidate": {
+                "is_best": bool(is_best),
+                "score": float(current_score),
+                "rank": current_rank
+            }
+        }
+
+
+def _rows_frame(rows):
+    """
+    Parses raw candidate rows (dicts keyed by CSV headers) exactly like
+    pd.read_csv would parse them from new_candidates.csv.
+    """
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(list(rows[0].keys()))
+    for row in rows:
+        writer.writerow(list(row.values()))
+    buf.seek(0)
+    return pd.read_csv(buf)
+
+
+def _distribution(counts):
+    # Same numbers as value_counts(normalize=True).mul(100).round(2)
+    total = sum(counts.values())
+    return {k: float(np.round(c / total * 100, 2)) for k, c in counts.items()}
+
+
+class BiasAggregates:
+    """
+    Per-category counts for the bias columns, kept up to date as candidates
+    come and go: one Counter for the whole population and one for the current
+    Top-N. summary() then costs O(categories) instead of a value_counts scan.
+    """
+
+    def __init__(self, cols):
+        self.cols = list(cols)
+        self.population = {col: Counter() for col in self.cols}
+        self.top = {col: Counter() for col in self.cols}
+        self.top_members = {} # ID -> record currently counted in self.top
+
+    def _update(self, counters, record, delta):
+        for col in self.cols:
+            value = record.get(col)
+            if value is None or pd.isna(value):
+                continue # value_counts drops NaN too
+            counter = counters[col]
+            counter[value] += delta
+            if counter[value] <= 0:
+                del counter[value]
+
+    def add(self, record):
+        self._update(self.population, record, 1)
+
+    def add_many(self, records):
+        """add() for every record, counted per distinct value."""
+        for col in self.cols:
+            counter = self.population[col]
+            for value, n in Counter(record.get(col) for record in records).items():
+                if value is None or pd.isna(value):
+                    continue
+                counter[value] += n
+
+    def remove(self, record):
+        self._update(self.population, record, -1)
+
+    def set_top(self, records):
+        """Makes `records` the Top-N; only members that changed are re-counted."""
+        new_members = {str(r['ID']): r for r in records}
+        for cand_id, record in list(self.top_members.items()):
+            if new_members.get(cand_id) is not record:
+                self._update(self.top, record, -1)
+                del self.top_members[cand_id]
+        for cand_id, record in new_members.items():
+            if cand_id not in self.top_members:
+                self._update(self.top, record, 1)
+                self.top_members[cand_id] = record
+
+    def summary(self):
+        summary_results = {}
+        for col in self.cols:
+            summary_results[col] = merge_distributions(_distribution(self.population[col]), _distribution(self.top[col]))
+        return summary_results
+
+
+class AnalysisSnapshot:
+    """
+    Immutable, versioned view of the scored pool for read-only endpoints.
+
+    Built once per data version and then shared by every request / thread:
+    the ranking is a tuple, the rank lookup a read-only mapping and the bias
+    summary is serialized to JSON up front.
+    """
+
+    def __init__(self, version, ranked, bias_summary, top_n):
+        self.version = version
+        self.top_n = top_n
+        self.ranked = tuple(ranked) # (id, name, score) in rank order
+        self.ranks = MappingProxyType({cand_id: i + 1 for i, (cand_id, _, _) in enumerate(self.ranked)})
+        self.bias_summary_json = json.dumps({"version": version, "top_n": top_n, "bias_summary": bias_summary})
+
+    def __len__(self):
+        return len(self.ranked)
+
+    def _entry(self, rank):
+        cand_id, name, score = self.ranked[rank - 1]
+        return {"rank": rank, "id": cand_id, "name": name, "score": score}
+
+    def leaderboard(self, offset=0, limit=10):
+        stop = min(offset + limit, len(self.ranked))
+        return [self._entry(rank) for rank in range(offset + 1, stop + 1)]
+
+    def candidate(self, candidate_id):
+        rank = self.ranks.get(str(candidate_id))
+        if rank is None:
+            return None
+        entry = self._entry(rank)
+        entry["is_best"] = rank == 1
+        return entry
+
+
+class ScoringEngine:
+    """
+    Long-lived scoring state for the web process.
+
+    The combined pool is loaded and scored once; after that only newly submitted
+    rows are scored. Candidates are kept in an ordered index (Score_Final desc,
+    then arrival order) so rank and best candidate are a binary search away.
+    Each candidate keeps its feature scores, so set_profile() with the same
+    features only re-weights.
+
+    With `shared` (a shared_state.SharedScoreState) the scored pool lives in
+    SQLite and this index mirrors it: one worker scores the pool and
+    publishes it, the others load the published records, and every change
+    (add_candidates in any process) is applied by each worker on its next
+    read. Rows given to add_candidates are expected to be the ones just
+    appended to the local store / CSV.
+    """
+
+    KEEP_COLS = ['ID', 'Nombre(s)', 'Apellido_Paterno', 'Score_Final']
+
+    def __init__(self, local_path, remote_url=None, top_n=None, remote_cache=None, store=None, workers=1, profile=None, shared=None):
+        self.source = RecruitmentAI(local_path, remote_url=remote_url, remote_cache=remote_cache, store=store, workers=workers)
+        self.shared = shared
+        self.profile = get_profile(profile)
+        self._fixed_top_n = top_n
+        self.top_n = top_n or self.profile.top_n
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._candidates = {} # ID -> display fields, feature scores, bias fields and Score_Final
+        self._keys = {}       # ID -> key currently stored in self._index
+        self._index = []      # sorted (-Score_Final, seq, ID)
+        self._seq = 0
+        self._bias = BiasAggregates([])
+        self._remote_version = None
+        self.version = 0 # bumped on every change to the scored pool
+        self._snapshot = None
+        self._shared_generation = None
+        self._shared_seq = 0 # last shared row applied to the index
+
+    def load(self):
+        """(Re)loads and scores the full pool. Called once, lazily."""
+        if self.shared is not None:
+            self._load_shared()
+            return
+        df = self.source.load_combined_data(columns=SCORING_COLUMNS)
+        with self._lock:
+            if self.source.remote_cache is not None:
+                self._remote_version = self.source.remote_cache.version
+            self._candidates, self._keys, self._index = {}, {}, []
+            self._seq = 0
+            self._bias = BiasAggregates([])
+            if not df.empty:
+                prepare_frame(df)
+                with metrics.stage('score'):
+                    score_sharded(df, self.source.workers, self.profile)
+                with metrics.stage('index'):
+                    self._insert_frame(df)
+            self.version += 1
+            self._loaded = True
+
+    # --- shared state (see shared_state.py) ---------------------------------
+
+    def _stamp(self):
+        """What the shared pool must have been scored for to be reused."""
+        remote = None
+        if self.source.remote_cache is not None:
+            text = self.source.remote_cache.get_text()
+            if text is not None:
+                remote = hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+        store = self.source.store
+        return {
+            "profile": self.profile.hash,
+            # So the other workers can adopt it (set_profile)
+            "profile_name": self.profile.name,
+            "profile_config": self.profile.config,
+            "remote": remote,
+            # Rows in the local store when scored (+ those added since); None for a CSV
+            "local_rows": len(store) if store is not None else None,
+        }
+
+    def _stamp_matches(self, stored, stamp):
+        if not stored or stored.get("profile") != stamp["profile"] or stored.get("remote") != stamp["remote"]:
+            return False
+        if stamp["local_rows"] is None:
+            return True
+        # Fewer rows than the store has: someone appended without publishing
+        return (stored.get("local_rows") or 0) >= stamp["local_rows"]
+
+    def _record_cols(self, df):
+        return [c for c in self.KEEP_COLS + FEATURE_COLS + BIAS_COLS if c in df.columns]
+
+    def _adopt_profile(self, stamp):
+        """Switches to the profile the shared pool was scored with (set_profile in another worker)."""
+        if not stamp or stamp.get("profile") in (None, self.profile.hash) or not stamp.get("profile_config"):
+            return
+        self.profile = compile_profile(stamp["profile_config"], stamp.get("profile_name") or 'custom')
+        self.top_n = self._fixed_top_n or self.profile.top_n
+
+    def _load_shared(self, adopt=True):
+        with self._lock, self.shared.loading():
+            if adopt:
+                self._adopt_profile(self.shared.state()['stamp'])
+            stamp = self._stamp()
+            if self.source.remote_cache is not None:
+                self._remote_version = self.source.remote_cache.version
+            if not self._stamp_matches(self.shared.state()['stamp'], stamp):
+                # First worker up (or the data / profile changed): score and publish
+                df = self.source.load_combined_data(columns=SCORING_COLUMNS)
+                records, cols = [], []
+                if not df.empty:
+                    prepare_frame(df)
+                    with metrics.stage('score'):
+                        score_sharded(df, self.source.workers, self.profile)
+                    cols = self._record_cols(df)
+                    records = df[cols].to_dict('records')
+                with metrics.stage('shared_publish'):
+                    self.shared.replace(records, cols, stamp)
+            self._sync_shared()
+            self._loaded = True
+
+    def _sync_shared(self):
+        """Applies the shared rows committed since the last sync (all of them after a replace)."""
+        with self._lock, metrics.stage('shared_sync'):
+            generation, rows = self.shared.changes_since(self._shared_seq)
+            if generation != self._shared_generation:
+                if self._shared_seq:
+                    generation, rows = self.shared.changes_since(0)
+                # Replaced: maybe re-scored with another profile
+                self._adopt_profile(self.shared.state()['stamp'])
+                self._candidates, self._keys, self._index = {}, {}, []
+                self._seq = 0
+                self._bias = BiasAggregates([])
+                self._shared_generation, self._shared_seq = generation, 0
+            elif not rows:
+                return
+            self._insert_records([record for _, record in rows], [seq for seq, _ in rows])
+            if rows:
+                self._shared_seq = rows[-1][0]
+            self.version += 1
+
+    def set_profile(self, profile):
+        """
+        Switches the scoring profile. With the same features hash the stored
+        feature scores are re-weighted; otherwise the pool is re-scored.
+        With `shared` the pool is republished for every worker: the others
+        adopt its profile on their next read.
+        """
+        profile = get_profile(profile)
+        with self._lock:
+            if self.shared is not None and self._loaded:
+                # Holding it keeps every upsert out until the pool is republished
+                with self.shared.loading():
+                    self._sync_shared() # rows other workers added since our last read
+                    self._set_profile(profile)
+            else:
+                self._set_profile(profile)
+
+    def _set_profile(self, profile):
+        same_features = profile.features_hash == self.profile.features_hash
+        self.profile = profile
+        self.top_n = self._fixed_top_n or profile.top_n
+        if not self._loaded:
+            return
+        if not same_features:
+            if self.shared is not None:
+                self._load_shared(adopt=False)
+            else:
+                self.load()
+            return
+        # Re-inserted in arrival order, so ties keep their order
+        records = [self._candidates[key[2]] for key in sorted(self._index, key=lambda key: key[1])]
+        df = pd.DataFrame.from_records(records)
+        if not df.empty:
+            with metrics.stage('score'):
+                apply_weights(df, profile)
+        if self.shared is not None:
+            cols = self._record_cols(df)
+            self.shared.replace(df[cols].to_dict('records') if cols else [], cols, self._stamp())
+            self._sync_shared()
+            return
+        self._candidates, self._keys, self._index = {}, {}, []
+        self._seq = 0
+        self._bias = BiasAggregates([])
+        if not df.empty:
+            with metrics.stage('index'):
+                self._insert_frame(df)
+        self.version += 1
+
+    def _remote_changed(self):
+        """True if the remote snapshot has a new body since the pool was scored."""
+        cache = self.source.remote_cache
+        if cache is None:
+            return False
+        # Revalidates once the TTL expired (a hit otherwise): nothing else in
+        # the web process calls get_text() once the pool is loaded
+        cache.get_text()
+        return cache.version != self._remote_version
+
+    def _ensure_loaded(self):
+        if not self._loaded or self._remote_changed():
+            # First use, or the remote snapshot changed since we scored it
+            self.load()
+        elif self.shared is not None and self.shared.changed():
+            # Another process changed the shared pool
+            self._sync_shared()
+
+    def _insert_frame(self, df):
+        if not self._index:
+            self._bias = BiasAggregates([c for c in BIAS_COLS if c in df.columns])
+        cols = [c for c in self.KEEP_COLS + FEATURE_COLS + self._bias.cols if c in df.columns]
+        self._insert_records(df[cols].to_dict('records'))
+        self.version += 1
+
+    def _insert_records(self, records, seqs=None):
+        if not records:
+            return
+        if not self._index and not self._bias.cols:
+            self._bias = BiasAggregates([c for c in BIAS_COLS if c in records[0]])
+        if self._index:
+            for i, record in enumerate(records):
+                self._insert(record, None if seqs is None else seqs[i])
+        else:
+            # Full (re)load: one sort instead of an insort per row
+            for i, record in enumerate(records):
+                cand_id = str(record['ID'])
+                seq = self._seq if seqs is None else seqs[i]
+                self._keys[cand_id] = (self._rank_score(record), seq, cand_id)
+                self._candidates[cand_id] = record # a re-submitted ID keeps its last row
+                self._seq = max(self._seq, seq + 1)
+            self._index = sorted(self._keys.values())
+            self._bias.add_many(self._candidates.values())
+        self._bias.set_top(self.top(self.top_n))
+
+    @staticmethod
+    def _rank_score(record):
+        score = float(record['Score_Final'])
+        if np.isnan(score):
+            score = float('-inf') # idxmax ignores NaN, keep them at the bottom
+        return -score
+
+    def _insert(self, record, seq=None):
+        cand_id = str(record['ID'])
+        if cand_id in self._keys:
+            # Re-submitted ID: drop the stale entry first
+            old_key = self._keys[cand_id]
+            del self._index[bisect.bisect_left(self._index, old_key)]
+            self._bias.remove(self._candidates[cand_id])
+        if seq is None:
+            seq = self._seq
+        key = (self._rank_score(record), seq, cand_id)
+        self._seq = max(self._seq, seq + 1)
+        bisect.insort(self._index, key)
+        self._keys[cand_id] = key
+        self._candidates[cand_id] = record
+        self._bias.add(record)
+
+    def add_candidate(self, row):
+        """Scores one raw CSV row (dict keyed by CSV headers) and indexes it."""
+        self.add_candidates([row])
+
+    def add_candidates(self, rows):
+        """Scores a batch of raw CSV rows in one vectorized pass and indexes them."""
+        if not rows:
+            return
+        profile = self.profile
+        with metrics.stage('score'):
+            df = prepare_frame(_rows_frame(rows))
+            score_frame(df, profile)
+        with self._lock:
+            self._ensure_loaded() # may adopt the profile another worker switched to
+            if profile is not self.profile:
+                score_frame(df, self.profile) # switched while we were scoring
+            if self.shared is not None:
+                while True:
+                    with metrics.stage('shared_publish'):
+                        published = self.shared.upsert(df[self._record_cols(df)].to_dict('records'),
+                                                       local_rows=len(rows), profile=self.profile.hash)
+                    self._sync_shared() # ours and whatever other workers added meanwhile
+                    if published:
+                        return
+                    # Republished with another profile since our last read: the
+                    # sync above adopted it, score again with it
+                    score_frame(df, self.profile)
+            with metrics.stage('index'):
+                self._insert_frame(df)
+
+    def rank_of(self, candidate_id):
+        key = self._keys.get(str(candidate_id))
+        if key is None:
+            return 0
+        return bisect.bisect_left(self._index, key) + 1
+
+    def best(self):
+        if not self._index:
+            return None
+        return self._candidates[self._index[0][2]]
+
+    def top(self, n):
+        return [self._candidates[key[2]] for key in self._index[:n]]
+
+    def bias_summary(self):
+        return self._bias.summary()
+
+    def snapshot(self):
+        """
+        Current AnalysisSnapshot. Rebuilt only when the pool changed since the
+        last call; otherwise the same object is returned to every caller.
+        """
+        snap = self._snapshot
+        if snap is not None and snap.version == self.version and self._loaded and not self._remote_changed() and (
+                self.shared is None or not self.shared.changed()):
+            return snap
+        with self._lock:
+            self._ensure_loaded()
+            if self._snapshot is None or self._snapshot.version != self.version:
+                ranked = []
+                for key in self._index:
+                    record = self._candidates[key[2]]
+                    ranked.append((key[2], f"{record['Nombre(s)']} {record['Apellido_Paterno']}", float(record['Score_Final'])))
+                self._snapshot = AnalysisSnapshot(self.version, ranked, self.bias_summary(), self.top_n)
+            return self._snapshot
+
+    def _best_payload(self, best):
+        return {
+            "id": str(best['ID']),
+            "name": f"{best['Nombre(s)']} {best['Apellido_Paterno']}",
+            "score": float(best['Score_Final'])
+        }
+
+    def results_for(self, current_candidate_id=None):
+        """Same payload as RecruitmentAI.run_analysis, served from memory."""
+        with self._lock:
+            self._ensure_loaded()
+            best = self.best()
+            if best is None:
+                return {"error": "No data found (Local or Remote)."}
+
+            is_best = False
+            current_score = 0
+            current_rank = 0
+            if current_candidate_id and str(current_candidate_id) in self._candidates:
+                current = self._candidates[str(current_candidate_id)]
+                current_score = current['Score_Final']
+                current_rank = self.rank_of(current_candidate_id)
+                is_best = current_rank == 1
+
+            return {
+                "best_candidate": self._best_payload(best),
+                "bias_summary": self.bias_summary(),
+                "current_candidate": {
+                    "is_best": is_best,
+                    "score": float(current_score),
+                    "rank": current_rank
+                }
+            }
+
+    def results_for_many(self, candidate_ids):
+        """
+        Batch variant of results_for: best candidate and bias summary computed
+        once, plus score / rank for every requested ID.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            best = self.best()
+            if best is None:
+                return {"error": "No data found (Local or Remote)."}
+            candidates = []
+            for cand_id in candidate_ids:
+                current = self._candidates.get(str(cand_id))
+                rank = self.rank_of(cand_id) if current is not None else 0
+                candidates.append({
+                    "id": str(cand_id),
+                    "score": float(current['Score_Final']) if current is not None else 0.0,
+                    "rank": rank,
+                    "is_best": rank == 1
+                })
+            return {
+                "best_candidate": self._best_payload(best),
+                "bias_summary": self.bias_summary(),
+                "candidates": candidates
+            }
@@ -0,0 +1,411 @@
+import os
+import re
+import json
+import threading
+import metrics
+
+try:
+    import fcntl
+except ImportError: # Windows: only the in-process lock applies
+    fcntl = None
+
+
+class FileLock:
+    """Thread lock + exclusive flock on a side file (same scheme as IDAllocator)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._file = None
+        self._depth = 0
+
+    def __enter__(self):
+        self._lock.acquire()
+        if self._depth == 0:
+            self._file = open(self.path, 'a')
+            if fcntl is not None:
+                fcntl.flock(self._file, fcntl.LOCK_EX)
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        self._depth -= 1
+        if self._depth == 0:
+            if fcntl is not None:
+                fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+        self._lock.release()
+
+
+class JSONLRecordStore:
+    """
+    Append-only JSON Lines store for the submitted candidate records.
+
+    Each record is one line, appended and fsync'd, so a write costs the same
+    no matter how big the database is and a crash can at most leave a torn
+    last line (dropped on the next open). An in-memory index maps candidate
+    `id` -> byte offset for point lookups. Superseded / torn lines are removed
+    by `compact()`, which runs automatically every `compact_every` appends.
+    """
+
+    def __init__(self, path, legacy_json_path=None, compact_every=1000):
+        self.path = path
+        self.legacy_json_path = legacy_json_path
+        self.compact_every = compact_every
+        self._lock = FileLock(path + '.lock')
+        self._index = {}   # id -> (offset, length)
+        self._order = []   # ids in first-seen order
+        self._dead = 0     # superseded or unreadable lines
+        self._end = 0      # bytes already indexed
+        self._inode = None
+        self._appends = 0
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self._lock:
+            if not os.path.exists(path) and legacy_json_path and os.path.exists(legacy_json_path):
+                self._migrate_legacy()
+            self._repair_tail()
+            self._catch_up()
+
+    # --- internal ---------------------------------------------------------
+
+    def _migrate_legacy(self):
+        """One-time import of the old database.json (a single JSON list)."""
+        records = []
+        try:
+            with open(self.legacy_json_path, 'r', encoding='utf-8') as f:
+                content = f.read().strip()
+                if content:
+                    records = json.loads(content)
+        except (OSError, ValueError) as e:
+            print(f"Warning: could not migrate {self.legacy_json_path}: {e}")
+        self._rewrite(records)
+
+    def _rewrite(self, records):
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            for record in records:
+                f.write(self._encode(record))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def _repair_tail(self):
+        # A crash mid-append leaves a line without '\n'; cut it so the next
+        # append does not glue a new record onto it.
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb+') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b'\n':
+                return
+            f.seek(0)
+            data = f.read()
+            f.truncate(data.rfind(b'\n') + 1)
+
+    @staticmethod
+    def _encode(record):
+        return (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+
+    def _reset_index(self):
+        self._index, self._order = {}, []
+        self._dead, self._end = 0, 0
+
+    def _catch_up(self):
+        """Indexes lines appended since the last call (possibly by other processes)."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self._reset_index()
+            self._inode = None
+            return
+        if st.st_ino != self._inode or st.st_size < self._end:
+            # Compacted (replaced) by someone else: start over
+            self._reset_index()
+            self._inode = st.st_ino
+        if st.st_size == self._end:
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(self._end)
+            offset = self._end
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break # partial line still being written
+                self._index_line(line, offset)
+                offset += len(line)
+            metrics.inc('bytes_read_total', offset - self._end, source='jsonl')
+            self._end = offset
+
+    def _index_line(self, line, offset):
+        try:
+            record_id = json.loads(line).get('id')
+        except (ValueError, AttributeError):
+            self._dead += 1
+            return
+        if record_id in self._index:
+            self._dead += 1
+        else:
+            self._order.append(record_id)
+        self._index[record_id] = (offset, len(line))
+
+    # --- public API -------------------------------------------------------
+
+    def append(self, record):
+        self.append_many([record])
+
+    def append_many(self, records):
+        """Appends records with a single write + fsync."""
+        payload = b''.join(self._encode(r) for r in records)
+        if not payload:
+            return
+        with self._lock:
+            self._catch_up()
+            with open(self.path, 'ab') as f:
+                if f.tell() > self._end:
+                    # Partial line of a writer that died mid-append (we hold the
+                    # lock): cut it, or our first record would be glued onto it
+                    f.truncate(self._end)
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            metrics.inc('bytes_written_total', len(payload), target='jsonl')
+            self._catch_up()
+            self._appends += len(records)
+            if self._appends >= self.compact_every:
+                self._appends = 0
+                if self._dead:
+                    self.compact()
+
+    def get(self, record_id):
+        """Latest record stored for `record_id`, or None."""
+        with self._lock:
+            self._catch_up()
+            entry = self._index.get(record_id)
+            if entry is None:
+                return None
+            offset, length = entry
+            with open(self.path, 'rb') as f:
+                f.seek(offset)
+                return json.loads(f.read(length))
+
+    def __contains__(self, record_id):
+        with self._lock:
+            self._catch_up()
+            return record_id in self._index
+
+    def __len__(self):
+        with self._lock:
+            self._catch_up()
+            return len(self._index)
+
+    def iter_records(self):
+        """Latest version of every record, in first-insertion order."""
+        with self._lock:
+            self._catch_up()
+            entries = [self._index[i] for i in self._order]
+            if not entries:
+                return
+            # The open handle keeps pointing at this version of the file even
+            # if another process compacts (replaces) it meanwhile.
+            f = open(self.path, 'rb')
+        with f:
+            for offset, length in entries:
+                f.seek(offset)
+                yield json.loads(f.read(length))
+
+    def all(self):
+        """Same list the old database.json held."""
+        return list(self.iter_records())
+
+    def compact(self):
+        """Rewrites the file without superseded or torn lines."""
+        with self._lock:
+            self._catch_up()
+            records = list(self.iter_records())
+            self._rewrite(records)
+            self._inode = None
+            self._catch_up()
+
+
+class EncryptedRecordStore:
+    """
+    Append-only encrypted copy of the records, one frame per record.
+
+    Frame layout: b"<length>:" + ciphertext + b"\n", where the ciphertext is
+    `cipher.encrypt(json.dumps(record))`. Only the new record is encrypted on
+    each submit, and reading streams frame by frame. `decrypt_all()` returns
+    the same text `cipher.decrypt` gave for the old encrypted_database.txt.
+    """
+
+    # A frame header, looked for at every offset when resyncing after a torn frame
+    _FRAME_START = re.compile(rb'(?=(\d+):)')
+
+    def __init__(self, path, cipher, legacy_path=None, seed=None):
+        self.path = path
+        self.cipher = cipher
+        self._lock = FileLock(path + '.lock')
+        self._inode = None
+        self._end = 0 # bytes already checked, up to the end of a complete frame
+        self._framed = set() # hash() of every ciphertext up to _end
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self._lock:
+            if not os.path.exists(path):
+                if legacy_path and os.path.exists(legacy_path):
+                    self._migrate_legacy(legacy_path)
+                elif seed is not None:
+                    # No encrypted copy yet: build it from the plain records
+                    self._write_frames(self._encode(r) for r in seed())
+
+    def _encrypt(self, record):
+        return self.cipher.encrypt(json.dumps(record)).encode('utf-8')
+
+    @staticmethod
+    def _frame(ciphertext):
+        return str(len(ciphertext)).encode('ascii') + b':' + ciphertext + b'\n'
+
+    def _encode(self, record):
+        return self._frame(self._encrypt(record))
+
+    def _write_frames(self, frames):
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            for frame in frames:
+                f.write(frame)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def _migrate_legacy(self, legacy_path):
+        """One-time import of the old single-blob encrypted_database.txt."""
+        records = []
+        try:
+            with open(legacy_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            if content:
+                records = json.loads(self.cipher.decrypt(content))
+        except (OSError, ValueError) as e:
+            print(f"Warning: could not migrate {legacy_path}: {e}")
+        self._write_frames(self._encode(r) for r in records)
+
+    @staticmethod
+    def _read_frame(f):
+        """Next ciphertext from `f`, or None at EOF / on a torn frame."""
+        header = b''
+        while True:
+            c = f.read(1)
+            if not c:
+                return None
+            if c == b':':
+                break
+            if not c.isdigit():
+                return None
+            header += c
+        if not header:
+            return None
+        length = int(header)
+        ciphertext = f.read(length)
+        if len(ciphertext) != length or f.read(1) != b'\n':
+            return None
+        return ciphertext
+
+    def _next_frame(self, f, start):
+        """Offset of the first complete frame after the torn one at `start`, or None."""
+        f.seek(start + 1)
+        data = f.read()
+        for match in self._FRAME_START.finditer(data):
+            header = match.group(1)
+            begin = match.start() + len(header) + 1
+            end = begin + int(header)
+            if data[end:end + 1] != b'\n':
+                continue
+            try:
+                record = json.loads(self.cipher.decrypt(data[begin:end].decode('utf-8')))
+            except ValueError:
+                continue
+            if isinstance(record, dict):
+                return start + 1 + match.start()
+        return None
+
+    def _frames(self, f, offset=0):
+        """(end offset, ciphertext) of every complete frame from `offset` on."""
+        f.seek(offset)
+        while True:
+            start = f.tell()
+            ciphertext = self._read_frame(f)
+            if ciphertext is not None:
+                yield f.tell(), ciphertext
+                continue
+            # EOF, or a frame torn by a writer that died mid-append. Older
+            # versions kept appending after such a frame: skip to those.
+            resume = self._next_frame(f, start)
+            if resume is None:
+                return
+            print(f"Warning: skipping {resume - start} torn bytes at offset {start} of {self.path}")
+            f.seek(resume)
+
+    def _catch_up(self):
+        """
+        Checks the frames appended since the last call (possibly by other
+        processes) and cuts what follows the last complete one. Called with
+        the lock held, so those bytes can only be the torn frame of a writer
+        that died mid-append: a valid frame is never cut.
+        """
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self._inode, self._end = None, 0
+            return
+        if st.st_ino != self._inode or st.st_size < self._end:
+            self._inode, self._end = st.st_ino, 0
+            self._framed = set()
+        if st.st_size == self._end:
+            return
+        with open(self.path, 'rb+') as f:
+            good = self._end
+            for end, ciphertext in self._frames(f, self._end):
+                good = end
+                self._framed.add(hash(ciphertext))
+            if good < st.st_size:
+                f.truncate(good)
+        self._end = good
+
+    def append(self, record):
+        self.append_many([record])
+
+    def append_many(self, records):
+        """
+        Encrypts only the given records and appends them with one fsync.
+        Records already framed as they are are skipped: the seed copies the
+        JSONL store, which can hold records whose encryption job (in this or
+        another worker) had not run yet.
+        """
+        with metrics.stage('encrypt'):
+            ciphertexts = [self._encrypt(r) for r in records]
+        if not ciphertexts:
+            return
+        with metrics.stage('encrypted_store_append'), self._lock:
+            self._catch_up() # never append after a torn frame
+            payload = b''.join(self._frame(c) for c in ciphertexts if hash(c) not in self._framed)
+            if not payload:
+                return
+            with open(self.path, 'ab') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+        metrics.inc('bytes_written_total', len(payload), target='encrypted')
+
+    def iter_records(self):
+        """Decrypts and yields records one frame at a time."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            for _, ciphertext in self._frames(f):
+                yield json.loads(self.cipher.decrypt(ciphertext.decode('utf-8')))
+
+    def decrypt_all(self):
+        """Plaintext of the whole database, as the old full-dump decrypt returned it."""
+        return json.dumps(list(self.iter_records()))
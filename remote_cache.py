@@ -0,0 +1,152 @@
+import os
+import io
+import json
+import time
+import threading
+import metrics
+
+
+class RemoteCSVCache:
+    """
+    Local snapshot of a remote CSV (the GitHub candidates file).
+
+    The last downloaded body is kept on disk together with its ETag /
+    Last-Modified headers. Once `ttl` seconds have passed the remote is
+    revalidated with a conditional GET (a 304 costs no body). If the remote is
+    unreachable the stale snapshot keeps being served. The parsed DataFrame is
+    kept in memory and only re-parsed when the body changes.
+    """
+
+    def __init__(self, url, cache_dir, ttl=300, timeout=5):
+        self.url = url
+        self.urls = [url]
+        if 'main' in url:
+            # Same fallback as before: the repo may still use `master`
+            self.urls.append(url.replace('main', 'master'))
+        self.ttl = ttl
+        self.timeout = timeout
+        name = os.path.splitext(os.path.basename(url))[0] or 'remote'
+        self.data_path = os.path.join(cache_dir, f'remote_{name}.csv')
+        self.meta_path = os.path.join(cache_dir, f'remote_{name}.meta.json')
+        self.version = 0 # bumped every time a new body is stored
+        self._lock = threading.Lock()
+        self._text = None
+        self._df = None
+        self._meta = {}
+        self._load_snapshot()
+
+    def _load_snapshot(self):
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(self.data_path, 'r', encoding='utf-8', newline='') as f:
+                self._text = f.read()
+            self._meta = meta
+            self.version += 1
+        except (OSError, ValueError):
+            self._text = None
+            self._meta = {}
+
+    def _write_atomic(self, path, content):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8', newline='') as f:
+            f.write(content)
+        os.replace(tmp, path)
+
+    def _save_snapshot(self):
+        os.makedirs(os.path.dirname(self.data_path), exist_ok=True)
+        self._write_atomic(self.data_path, self._text)
+        self._write_atomic(self.meta_path, json.dumps(self._meta))
+
+    def _save_meta(self):
+        try:
+            self._write_atomic(self.meta_path, json.dumps(self._meta))
+        except OSError:
+            pass
+
+    def _is_fresh(self):
+        return time.time() - self._meta.get('checked_at', 0) < self.ttl
+
+    def _revalidate(self):
+        # Start with the URL that answered last time (skips the main -> master 404)
+        urls = sorted(self.urls, key=lambda u: u != self._meta.get('url'))
+        for url in urls:
+            headers = {}
+            if self._text is not None and self._meta.get('url') == url:
+                if self._meta.get('etag'):
+                    headers['If-None-Match'] = self._meta['etag']
+                if self._meta.get('last_modified'):
+                    headers['If-Modified-Since'] = self._meta['last_modified']
+            try:
+                import requests # deferred: only needed once the TTL expires
+                r = requests.get(url, headers=headers, timeout=self.timeout)
+            except Exception as e:
+                print(f"Warning: GitHub fetch failed: {e}")
+                metrics.inc('remote_cache_requests_total', result='error')
+                # Try again on next call instead of hammering a dead remote
+                self._meta['checked_at'] = time.time()
+                return
+            if r.status_code == 304:
+                metrics.inc('remote_cache_requests_total', result='not_modified')
+                self._meta['checked_at'] = time.time()
+                self._save_meta()
+                return
+            if r.status_code == 200:
+                metrics.inc('remote_cache_requests_total', result='miss')
+                metrics.inc('bytes_read_total', len(r.content), source='remote')
+                self._text = r.text
+                self._df = None
+                self._meta = {
+                    'url': url,
+                    'etag': r.headers.get('ETag'),
+                    'last_modified': r.headers.get('Last-Modified'),
+                    'checked_at': time.time(),
+                }
+                self.version += 1
+                try:
+                    self._save_snapshot()
+                except OSError as e:
+                    print(f"Warning: could not write remote snapshot: {e}")
+                return
+        print(f"Warning: Could not fetch from GitHub ({r.status_code})")
+        metrics.inc('remote_cache_requests_total', result='error')
+        self._meta['checked_at'] = time.time()
+
+    def get_text(self):
+        """Returns the CSV body (possibly stale), or None if it was never fetched."""
+        with self._lock:
+            if self._is_fresh():
+                metrics.inc('remote_cache_requests_total', result='hit')
+            else:
+                self._revalidate()
+            return self._text
+
+    def cached_text(self):
+        """The body stored last (None if never fetched), without revalidating."""
+        with self._lock:
+            return self._text
+
+    def get_dataframe(self):
+        """Parsed copy of the remote CSV, or None. The parse itself is cached."""
+        text = self.get_text()
+        if text is None:
+            return None
+        with self._lock:
+            if self._df is None and self._text is not None:
+                import pandas as pd
+                self._df = pd.read_csv(io.StringIO(self._text))
+            # Callers rename / add columns in place
+            return self._df.copy()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def get_remote_cache(url, cache_dir, ttl=300, timeout=5):
+    """One cache per URL and process, shared by the ID generator and the model."""
+    with _caches_lock:
+        cache = _caches.get(url)
+        if cache is None:
+            cache = RemoteCSVCache(url, cache_dir, ttl=ttl, timeout=timeout)
+            _caches[url] = cache
+        return cache
@@ -0,0 +1,136 @@
+"""
+Scoring profiles: weights, title tiers, certification keywords, language
+level map, experience multiplier and Top-N, loaded from JSON.
+
+A profile is compiled once (regexes, level lookup table, weight list) and
+cached by the hash of its settings. The settings are split in two parts:
+
+- features (title tiers, certification keywords / points, level map): these
+  decide how candidate text is turned into Score_Titulo /
+  Score_Certificaciones / Score_Idiomas. Their hash is `features_hash`.
+- weights (weights, experience factor, top_n): only combine those feature
+  scores. Profiles sharing a `features_hash` reuse the memoized feature
+  scores and are re-weighted without parsing any text again.
+
+scoring_profiles.json:
+
+    {
+      "ml_engineer": {"weights": {"Python_Pct": 0.35, "R_Pct": 0.0}},
+      "senior": {"extends": "ml_engineer", "experience_factor": 0.1}
+    }
+
+Keys that a profile leaves out come from `extends` (or the built-in
+defaults in model_logic). `weights` and `level_map` are merged key by key:
+"ml_engineer" above changes two weights and keeps the other default ones,
+in the default order. To drop an inherited weight set it to 0. Every other
+key (lists such as cert_keywords included) replaces the inherited value.
+"""
+import re
+import json
+import hashlib
+import threading
+import numpy as np
+
+FEATURE_KEYS = ('titulo_tiers', 'titulo_default', 'cert_keywords', 'cert_points', 'cert_max', 'level_map')
+WEIGHT_KEYS = ('weights', 'experience_factor', 'top_n')
+# Dicts that `extends` merges key by key instead of replacing
+MERGED_KEYS = ('weights', 'level_map')
+
+# Columns a weight can refer to (inputs of Score_Base)
+FEATURE_COLS = [
+    'Python_Pct', 'SQL_Pct', 'Estadistica_Avanzada_Pct', 'R_Pct',
+    'Score_Titulo', 'Score_Certificaciones', 'Score_Idiomas', 'Anios_de_experiencia'
+]
+
+
+def _hash(settings):
+    payload = json.dumps(settings, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def _keyword_regex(keywords):
+    if not keywords:
+        # '' would match every string; any() over no keywords is False
+        return re.compile('(?!)')
+    return re.compile('|'.join(re.escape(k.lower()) for k in keywords))
+
+
+class ScoringProfile:
+    """Compiled, read-only form of a profile config. Build it with compile_profile()."""
+
+    def __init__(self, name, config):
+        missing = [k for k in FEATURE_KEYS + WEIGHT_KEYS if k not in config]
+        if missing:
+            raise ValueError(f"Scoring profile {name!r} is missing {missing}")
+        unknown = [col for col in config['weights'] if col not in FEATURE_COLS]
+        if unknown:
+            raise ValueError(f"Scoring profile {name!r} weighs unknown features {unknown}")
+
+        self.name = name
+        self.config = {k: config[k] for k in FEATURE_KEYS + WEIGHT_KEYS}
+        self.hash = _hash(self.config)
+        self.features_hash = _hash({k: config[k] for k in FEATURE_KEYS})
+
+        # Features
+        self.titulo_patterns = [(_keyword_regex(tier['keywords']), float(tier['score'])) for tier in config['titulo_tiers']]
+        self.titulo_default = float(config['titulo_default'])
+        self.cert_pattern = _keyword_regex(config['cert_keywords'])
+        self.cert_points = float(config['cert_points'])
+        self.cert_max = float(config['cert_max'])
+        self.level_categories = [level.lower() for level in config['level_map']]
+        # code -1 (unknown level) -> 0
+        self.level_lookup = np.array([float(v) for v in config['level_map'].values()] + [0.0])
+
+        # Weights (summed in this order)
+        self.weights = [(col, float(w)) for col, w in config['weights'].items()]
+        self.experience_factor = float(config['experience_factor'])
+        self.top_n = int(config['top_n'])
+
+    def __repr__(self):
+        return f"ScoringProfile({self.name!r}, hash={self.hash})"
+
+
+_compiled = {}
+_compiled_lock = threading.Lock()
+
+def compile_profile(config, name='custom'):
+    """Compiled profile for `config`, shared by every caller with the same settings."""
+    key = (name, _hash({k: config.get(k) for k in FEATURE_KEYS + WEIGHT_KEYS}))
+    with _compiled_lock:
+        profile = _compiled.get(key)
+        if profile is None:
+            profile = _compiled[key] = ScoringProfile(name, config)
+        return profile
+
+
+def resolve_profiles(raw, base):
+    """{name: config} with `extends` applied; every profile starts from `base`."""
+    resolved = {}
+
+    def resolve(name, seen=()):
+        if name in resolved:
+            return resolved[name]
+        if name not in raw:
+            raise ValueError(f"Unknown scoring profile {name!r}")
+        if name in seen:
+            raise ValueError(f"Scoring profile {name!r} extends itself")
+        entry = dict(raw[name])
+        parent = entry.pop('extends', None)
+        config = dict(resolve(parent, seen + (name,)) if parent else base)
+        for key, value in entry.items():
+            if key in MERGED_KEYS and isinstance(value, dict) and isinstance(config.get(key), dict):
+                value = {**config[key], **value}
+            config[key] = value
+        resolved[name] = config
+        return config
+
+    for name in raw:
+        resolve(name)
+    return resolved
+
+
+def load_profiles(path, base):
+    """Compiled profiles from a JSON file, keyed by name. `base` is the default config."""
+    with open(path, 'r', encoding='utf-8') as f:
+        raw = json.load(f)
+    return {name: compile_profile(config, name) for name, config in resolve_profiles(raw, base).items()}
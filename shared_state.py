@@ -0,0 +1,201 @@
+import os
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from record_store import FileLock
+
+
+def _json_default(value):
+    # NumPy scalars that slipped through to_dict('records')
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+# Reused: json.dumps(..., default=...) builds a new encoder on every call
+_encoder = json.JSONEncoder(default=_json_default, ensure_ascii=False)
+
+# PRAGMA user_version of the current layout; a file with another one is
+# emptied on open and rescored by the first worker (it is only a cache)
+SCHEMA_VERSION = 2
+
+
+class SharedScoreState:
+    """
+    Scored candidate pool shared by every gunicorn worker (and CLI process),
+    in a local SQLite database in WAL mode: one writer at a time, readers
+    never blocked and always seeing whole transactions.
+
+    - candidates: one row per ID with its arrival `seq` and the record
+      (display, feature and bias fields, as a JSON list in `columns` order).
+    - state: `generation` (bumped whenever the whole pool is replaced), the
+      record `columns` and the `stamp` the pool was scored for.
+
+    Workers keep their own in-memory index and call changed() before
+    serving. It reads PRAGMA data_version, a per-connection counter that
+    moves only when another connection commits, so an unchanged pool costs
+    no table access; when it moved, changes_since() returns just the rows
+    with a higher `seq` than the last one applied. Ranks and bias counts are
+    derived by each worker from those records (ScoringEngine / BiasAggregates),
+    so a write only stores the records.
+    """
+
+    def __init__(self, path, timeout=30.0):
+        self.path = path
+        self.timeout = timeout
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # Held while a worker (re)scores the full pool, so the others wait and reuse it
+        self._loading_lock = FileLock(path + '.lock')
+        self._lock = threading.RLock()
+        self._conn = None
+        self._pid = None
+        self._seen_version = None # data_version as of the last changes_since()
+
+    # --- connection ---------------------------------------------------------
+
+    def _connect(self):
+        # One connection per process: never reuse one inherited through fork()
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL') # WAL: durable up to the last checkpoint, never corrupt
+            self._migrate(conn)
+            self._conn, self._pid = conn, os.getpid()
+            self._seen_version = None
+        return self._conn
+
+    def _migrate(self, conn):
+        if conn.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION:
+            return
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # Checked again under the write lock: another worker may have just done it
+            if conn.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+                for table in ('state', 'candidates', 'bias_counts'):
+                    conn.execute(f'DROP TABLE IF EXISTS {table}')
+                conn.execute('CREATE TABLE state (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+                conn.execute('CREATE TABLE candidates ('
+                             'id TEXT PRIMARY KEY, seq INTEGER NOT NULL UNIQUE, record TEXT NOT NULL)')
+                conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    @contextmanager
+    def _transaction(self, write=False):
+        with self._lock:
+            conn = self._connect()
+            # IMMEDIATE takes the write lock up front: no upgrade deadlocks between workers
+            conn.execute('BEGIN IMMEDIATE' if write else 'BEGIN')
+            try:
+                yield conn
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+
+    @contextmanager
+    def loading(self):
+        """Exclusive across processes; wrap "check state(), score, replace()" in it."""
+        with self._loading_lock:
+            yield
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+    # --- state --------------------------------------------------------------
+
+    def _state(self, conn):
+        state = {key: json.loads(value) for key, value in conn.execute('SELECT key, value FROM state')}
+        state.setdefault('generation', 0)
+        state.setdefault('columns', [])
+        state.setdefault('stamp', None)
+        return state
+
+    def _set_state(self, conn, **values):
+        conn.executemany('INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)',
+                         [(key, json.dumps(value)) for key, value in values.items()])
+
+    def state(self):
+        """{"generation", "columns", "stamp"} of the shared pool (generation 0: never loaded)."""
+        with self._transaction() as conn:
+            return self._state(conn)
+
+    def changed(self):
+        """True if another connection committed since the last changes_since()."""
+        with self._lock:
+            version = self._connect().execute('PRAGMA data_version').fetchone()[0]
+            return version != self._seen_version
+
+    # --- writes -------------------------------------------------------------
+
+    def _rows(self, records, columns, first_seq):
+        for seq, record in enumerate(records, start=first_seq):
+            values = [record.get(col) for col in columns]
+            yield str(record['ID']), seq, _encoder.encode(values)
+
+    def replace(self, records, columns, stamp):
+        """Makes `records` (dicts with at least an ID) the whole pool. Returns the new generation."""
+        columns = list(columns)
+        with self._transaction(write=True) as conn:
+            generation = self._state(conn)['generation'] + 1
+            conn.execute('DELETE FROM candidates')
+            # Re-submitted IDs: the last row wins, like ScoringEngine._insert
+            conn.executemany('INSERT OR REPLACE INTO candidates (id, seq, record) VALUES (?, ?, ?)',
+                             self._rows(records, columns, 1))
+            self._set_state(conn, generation=generation, columns=columns, stamp=stamp)
+        return generation
+
+    def upsert(self, records, local_rows=0, profile=None):
+        """
+        Adds `records` after the current pool (a known ID moves to the end
+        with its new score). `local_rows` is added to the stamp's
+        "local_rows" (rows appended to the local store), if it has one.
+
+        `profile` is the hash of the profile `records` were scored with. If
+        the pool's stamp names another one (republished meanwhile), nothing
+        is written and False is returned. Waits for a running load(), whose
+        replace() would otherwise drop these records.
+        """
+        if not records:
+            return True
+        with self.loading(), self._transaction(write=True) as conn:
+            state = self._state(conn)
+            stored = (state['stamp'] or {}).get('profile')
+            if profile is not None and stored is not None and stored != profile:
+                return False
+            columns = state['columns']
+            if not columns:
+                columns = list(records[0].keys())
+                self._set_state(conn, columns=columns)
+            first_seq = conn.execute('SELECT COALESCE(MAX(seq), 0) + 1 FROM candidates').fetchone()[0]
+            conn.executemany('INSERT OR REPLACE INTO candidates (id, seq, record) VALUES (?, ?, ?)',
+                             self._rows(records, columns, first_seq))
+            stamp = state['stamp']
+            if local_rows and stamp and stamp.get('local_rows') is not None:
+                self._set_state(conn, stamp=dict(stamp, local_rows=stamp['local_rows'] + local_rows))
+        return True
+
+    # --- reads --------------------------------------------------------------
+
+    def changes_since(self, seq=0):
+        """
+        (generation, [(seq, record dict), ...]) for the rows with a higher
+        `seq`, in seq order. When the generation differs from the caller's,
+        the pool was replaced: ask again with seq=0.
+        """
+        with self._lock:
+            # Read before the rows: a commit in between is reported again, never lost
+            version = self._connect().execute('PRAGMA data_version').fetchone()[0]
+            with self._transaction() as conn:
+                state = self._state(conn)
+                columns = state['columns']
+                rows = [(row_seq, dict(zip(columns, json.loads(record))))
+                        for row_seq, record in conn.execute(
+                            'SELECT seq, record FROM candidates WHERE seq > ? ORDER BY seq', (seq,))]
+            self._seen_version = version
+        return state['generation'], rows
@@ -45,7 +45,12 @@ document.getElementById('candidateForm').addEventListener('submit', async functi
             body: JSON.stringify(payload)
         });
 
-        const data = await response.json();
+        let data = await response.json();
+
+        // /submit answers right away with a job; the score arrives when it finishes
+        if (data.status === 'accepted') {
+            data = await waitForJob(data.status_url);
+        }
 
         if (data.status === 'success') {
             displayResults(data.results, data.id);
@@ -60,6 +65,23 @@ document.getElementById('candidateForm').addEventListener('submit', async functi
     }
 });
 
+const JOB_TIMEOUT_MS = 60000;
+
+async function waitForJob(statusUrl) {
+    // A job queued by a worker that was restarted never finishes: give up after a while
+    const deadline = Date.now() + JOB_TIMEOUT_MS;
+    let delay = 200;
+    while (Date.now() < deadline) {
+        await new Promise(resolve => setTimeout(resolve, delay));
+        const job = await (await fetch(statusUrl)).json();
+        if (job.state === 'finished') return job.result;
+        if (job.state === 'failed') return { status: 'error', message: job.error };
+        if (job.status === 'error') return job;
+        delay = Math.min(delay * 2, 2000);
+    }
+    return { status: 'error', message: 'Tu registro se guardó, pero el análisis no terminó a tiempo. Inténtalo más tarde.' };
+}
+
 let currentResults = null;
 
 function displayResults(results, newId) {
@@ -0,0 +1,90 @@
+import os
+import sys
+import csv
+import io
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+CANDIDATOS_CSV = os.path.join(ROOT, 'data', 'candidatos.csv')
+
+
+class CSVServer:
+    """
+    Local stand-in for raw.githubusercontent.com: serves `files` (path ->
+    body) with an ETag and answers If-None-Match with a 304. Every request is
+    logged as (path, If-None-Match header).
+    """
+
+    def __init__(self):
+        self.files = {}
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                inm = self.headers.get('If-None-Match')
+                server.requests.append((self.path, inm))
+                body = server.files.get(self.path)
+                if body is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                etag = '"%s"' % hashlib.sha1(body.encode('utf-8')).hexdigest()[:12]
+                if inm == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                payload = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Type', 'text/plain; charset=utf-8')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        self._running = True
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}{path}"
+
+    def stop(self):
+        """Closes the socket: later requests get "connection refused"."""
+        if self._running:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._running = False
+
+
+@pytest.fixture
+def csv_server():
+    server = CSVServer()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def candidatos_text():
+    with open(CANDIDATOS_CSV, 'r', encoding='utf-8', newline='') as f:
+        return f.read()
+
+
+def with_row(text, **values):
+    """`text` (candidatos.csv) plus a copy of its first row with `values` changed."""
+    rows = list(csv.DictReader(io.StringIO(text)))
+    row = dict(rows[0], **values)
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=list(rows[0].keys()), lineterminator='\n')
+    writer.writerow(row)
+    return text.rstrip('\r\n') + '\n' + buf.getvalue()
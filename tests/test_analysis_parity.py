@@ -0,0 +1,57 @@
+"""The sharded and streaming analysis paths must give what run_analysis gives."""
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import CANDIDATOS_CSV
+import model_logic
+from model_logic import RecruitmentAI
+
+ROWS = 1000
+
+
+@pytest.fixture
+def pool_csv(tmp_path):
+    # Sampled with replacement from candidatos.csv: tied scores under
+    # different IDs (which one wins is decided by row order), duplicate IDs,
+    # and negative experience for NaN / -inf Score_Final
+    raw = pd.read_csv(CANDIDATOS_CSV, dtype=str, keep_default_na=False)
+    rng = np.random.default_rng(7)
+    df = raw.iloc[rng.integers(0, len(raw), ROWS)].reset_index(drop=True)
+    df['ID'] = df['ID'] + '-' + (df.index % 4).astype(str)
+    df.loc[rng.choice(ROWS, 40, replace=False), 'Años de experiencia'] = '-2'
+    df.loc[rng.choice(ROWS, 10, replace=False), 'Años de experiencia'] = '-1'
+    path = tmp_path / 'candidatos.csv'
+    df.to_csv(path, index=False)
+    return str(path), df
+
+
+def _candidate_ids(df):
+    ids = df['ID']
+    counts = ids.value_counts()
+    nan_id = df.loc[df['Años de experiencia'] == '-2', 'ID'].iloc[0]
+    return [None, 'DS_MISSING', ids.iloc[0], ids.iloc[-1], counts.index[0], nan_id]
+
+
+def _run(path, candidate_id, **kwargs):
+    # As JSON, so a NaN score compares equal to itself
+    return json.dumps(RecruitmentAI(path, **kwargs).run_analysis(candidate_id), sort_keys=True)
+
+
+@pytest.mark.filterwarnings('ignore::RuntimeWarning') # log1p of negative experience
+def test_sharded_matches_single_process(pool_csv, monkeypatch):
+    path, df = pool_csv
+    monkeypatch.setattr(model_logic, 'MIN_ROWS_PER_SHARD', 50)
+    assert len(model_logic.shard_bounds(ROWS, 4)) == 4
+    for candidate_id in _candidate_ids(df):
+        assert _run(path, candidate_id, workers=4) == _run(path, candidate_id), candidate_id
+
+
+@pytest.mark.filterwarnings('ignore::RuntimeWarning')
+@pytest.mark.parametrize('chunksize', [77, ROWS])
+def test_streaming_matches_run_analysis(pool_csv, chunksize):
+    path, df = pool_csv
+    source = RecruitmentAI(path)
+    for candidate_id in _candidate_ids(df):
+        streamed = json.dumps(source.run_analysis_streaming(candidate_id, chunksize=chunksize), sort_keys=True)
+        assert streamed == _run(path, candidate_id), candidate_id
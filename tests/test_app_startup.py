@@ -0,0 +1,90 @@
+import os
+import sys
+import json
+import csv
+import subprocess
+from conftest import ROOT
+from record_store import JSONLRecordStore
+
+PROBE = """
+import json, app
+lazy = [name for name in ('record_store', 'encrypted_store') if name in app._singletons]
+ids = [r['id'] for r in app.get_encrypted_store().iter_records()]
+print(json.dumps({"built_at_import": lazy, "encrypted_ids": ids}))
+"""
+
+
+# /submit, then a batch, on a database with no encrypted copy yet
+SUBMIT_PROBE = """
+import json, app
+def submit(ids):
+    records = [{'id': new_id} for new_id in ids]
+    app.persist_candidates(records, [app.candidate_to_row({}, new_id) for new_id in ids])
+submit(['DS04'])
+submit(['DS05', 'DS06'])
+print(json.dumps({
+    "jsonl_ids": [r['id'] for r in app.get_record_store().iter_records()],
+    "encrypted_ids": [r['id'] for r in app.get_encrypted_store().iter_records()],
+}))
+"""
+
+
+def _seed(data_dir, n=3):
+    data_dir.mkdir()
+    JSONLRecordStore(str(data_dir / 'database.jsonl')).append_many(
+        [{'id': f'DS0{i}', 'Nombre(s)': f'N{i}'} for i in range(1, n + 1)])
+
+
+def _run(probe, data_dir):
+    env = dict(os.environ, RECRUITMENT_DATA_DIR=str(data_dir), SHARED_STATE_PATH='')
+    out = subprocess.run([sys.executable, '-c', probe], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_import_app_defers_record_stores(tmp_path):
+    data_dir = tmp_path / 'data'
+    _seed(data_dir)
+    result = _run(PROBE, data_dir)
+
+    assert result['built_at_import'] == []
+    # First use still seeds the encrypted frames from the JSONL database
+    assert result['encrypted_ids'] == ['DS01', 'DS02', 'DS03']
+
+
+def test_first_submit_is_encrypted_once(tmp_path):
+    data_dir = tmp_path / 'data'
+    _seed(data_dir)
+    with open(data_dir / 'new_candidates.csv', 'w', encoding='utf-8', newline='') as f:
+        csv.writer(f).writerow(_csv_headers())
+    result = _run(SUBMIT_PROBE, data_dir)
+    assert result['jsonl_ids'] == ['DS01', 'DS02', 'DS03', 'DS04', 'DS05', 'DS06']
+    assert result['encrypted_ids'] == result['jsonl_ids']
+
+
+def _csv_headers():
+    with open(os.path.join(ROOT, 'data', 'candidatos.csv'), 'r', encoding='utf-8', newline='') as f:
+        return next(csv.reader(f))
+
+
+# The job never runs: as if the worker was restarted right after answering
+ACCEPTED_PROBE = """
+import json, app
+app.job_queue._executor.submit = lambda *args, **kwargs: None
+response = app.app.test_client().post('/submit', json={'datos_personales': {'nombre': 'Ana'}})
+print(json.dumps({
+    "status": response.status_code,
+    "id": response.get_json()['id'],
+    "encrypted_ids": [r['id'] for r in app.get_encrypted_store().iter_records()],
+}))
+"""
+
+
+def test_submit_encrypts_before_answering(tmp_path):
+    data_dir = tmp_path / 'data'
+    _seed(data_dir)
+    with open(data_dir / 'new_candidates.csv', 'w', encoding='utf-8', newline='') as f:
+        csv.writer(f).writerow(_csv_headers())
+    (data_dir / 'id_counter.txt').write_text('3')
+    result = _run(ACCEPTED_PROBE, data_dir)
+    assert result['status'] == 202
+    assert result['encrypted_ids'] == ['DS01', 'DS02', 'DS03', result['id']]
@@ -0,0 +1,47 @@
+import os
+import numpy as np
+import pandas as pd
+from conftest import CANDIDATOS_CSV
+from candidate_store import ColumnarCandidateStore
+
+
+def _raw():
+    return pd.read_csv(CANDIDATOS_CSV, dtype=str, keep_default_na=False)
+
+
+def test_append_rows_round_trip(tmp_path):
+    raw = _raw()
+    store = ColumnarCandidateStore(str(tmp_path / 'store'), list(raw.columns))
+    rows = raw.to_dict('records')
+    store.append_rows(rows[:10])
+    new = dict(rows[10], ID='DSX', Colonia='Nueva colonia', Edad='', Sueldo_mensual='abc')
+    store.append_rows([new])
+
+    df = store.read()
+    assert len(store) == len(df) == 11
+    assert list(df['ID'].astype(str)) == [r['ID'] for r in rows[:10]] + ['DSX']
+    assert df['Colonia'].iloc[-1] == 'Nueva colonia'
+    assert np.isnan(df['Edad'].iloc[-1]) and np.isnan(df['Sueldo_mensual'].iloc[-1])
+    assert df['Edad'].iloc[0] == float(rows[0]['Edad'])
+
+
+def test_interrupted_append_is_cut(tmp_path):
+    raw = _raw()
+    path = str(tmp_path / 'store')
+    store = ColumnarCandidateStore(path, list(raw.columns))
+    rows = raw.to_dict('records')
+    store.append_rows(rows[:5])
+
+    # Bytes of an append that died before committing meta.json
+    for name in os.listdir(path):
+        if name.endswith(('.f8', '.i4', '.cats.jsonl')):
+            with open(os.path.join(path, name), 'ab') as f:
+                f.write(b'\x01garbage\n')
+    assert len(store) == 5
+
+    store.append_rows([dict(rows[5], Colonia='Otra colonia')])
+    reopened = ColumnarCandidateStore(path, list(raw.columns))
+    df = reopened.read()
+    assert list(df['ID'].astype(str)) == [r['ID'] for r in rows[:6]]
+    assert df['Colonia'].iloc[-1] == 'Otra colonia'
+    assert 'garbage' not in ''.join(map(str, df['Colonia'].cat.categories))
@@ -0,0 +1,56 @@
+import time
+from conftest import with_row
+from remote_cache import RemoteCSVCache
+from model_logic import ScoringEngine
+
+TTL = 0.3
+
+# Scores above everyone in candidatos.csv
+STAR = {
+    'ID': 'DS999', 'Años de experiencia': '30', 'Título_Principal': 'Ph.D. en IA',
+    'Python_Porcentaje': '1.0', 'R_Porcentaje': '1.0', 'SQL_Porcentaje': '1.0',
+    'Estadística_Avanzada_Porcentaje': '1.0',
+}
+
+
+def _engine(csv_server, tmp_path):
+    cache = RemoteCSVCache(csv_server.url('/main/candidatos.csv'), str(tmp_path), ttl=TTL)
+    return ScoringEngine(str(tmp_path / 'new_candidates.csv'), remote_cache=cache)
+
+
+def test_results_pick_up_remote_update_after_ttl(csv_server, candidatos_text, tmp_path):
+    csv_server.files['/main/candidatos.csv'] = candidatos_text
+    engine = _engine(csv_server, tmp_path)
+    before = engine.results_for()
+    assert before['best_candidate']['id'] != 'DS999'
+
+    csv_server.files['/main/candidatos.csv'] = with_row(candidatos_text, **STAR)
+    # Within the TTL the remote is not asked again
+    assert engine.results_for() == before
+    time.sleep(TTL + 0.1)
+    assert engine.results_for()['best_candidate']['id'] == 'DS999'
+
+
+def test_unchanged_remote_is_not_rescored(csv_server, candidatos_text, tmp_path):
+    csv_server.files['/main/candidatos.csv'] = candidatos_text
+    engine = _engine(csv_server, tmp_path)
+    engine.results_for()
+    version = engine.version
+    time.sleep(TTL + 0.1)
+    engine.results_for() # 304: same body, same pool
+    assert engine.version == version
+    assert csv_server.requests[-1][1] is not None
+
+
+def test_snapshot_picks_up_remote_update_after_ttl(csv_server, candidatos_text, tmp_path):
+    csv_server.files['/main/candidatos.csv'] = candidatos_text
+    engine = _engine(csv_server, tmp_path)
+    first = engine.snapshot()
+    assert engine.snapshot() is first
+
+    csv_server.files['/main/candidatos.csv'] = with_row(candidatos_text, **STAR)
+    time.sleep(TTL + 0.1)
+    # /leaderboard, /candidates/<id> and /bias_summary are served from here
+    snap = engine.snapshot()
+    assert len(snap) == len(first) + 1
+    assert snap.candidate('DS999')['is_best']
@@ -0,0 +1,47 @@
+import os
+from id_allocator import IDAllocator
+
+
+class Floor:
+    """Remote max ID as seen by the allocator; None until the remote CSV is fetched."""
+
+    def __init__(self, value=None):
+        self.value = value
+
+    def __call__(self):
+        return self.value
+
+
+def test_counter_is_not_seeded_while_remote_is_unknown(tmp_path):
+    path = str(tmp_path / 'id_counter.txt')
+    floor = Floor()
+    allocator = IDAllocator(path, seed=lambda: 3, floor=floor)
+
+    assert allocator.allocate() == 'DS04' # local data only
+    assert allocator.allocate_block(2) == ['DS05', 'DS06']
+    assert not os.path.exists(path)
+
+    floor.value = 100 # the remote CSV is back: DS01-DS100
+    assert allocator.allocate() == 'DS101'
+    assert IDAllocator(path, seed=lambda: 3, floor=Floor()).allocate() == 'DS102'
+    assert not os.path.exists(path + '.partial')
+
+
+def test_counter_follows_a_growing_remote(tmp_path):
+    path = str(tmp_path / 'id_counter.txt')
+    floor = Floor(100)
+    allocator = IDAllocator(path, seed=lambda: 0, floor=floor)
+    assert allocator.allocate() == 'DS101'
+
+    floor.value = 150 # new remote version
+    assert allocator.allocate() == 'DS151'
+    floor.value = 120 # never goes back
+    assert allocator.allocate() == 'DS152'
+
+
+def test_no_floor_seeds_once(tmp_path):
+    path = str(tmp_path / 'id_counter.txt')
+    calls = []
+    allocator = IDAllocator(path, seed=lambda: calls.append(1) or 7)
+    assert [allocator.allocate() for _ in range(3)] == ['DS08', 'DS09', 'DS10']
+    assert calls == [1]
@@ -0,0 +1,68 @@
+import os
+from encryption import MultiSubstitutionCipher
+from record_store import JSONLRecordStore, EncryptedRecordStore
+
+TORN = b'57:' + b'x' * 20 # header and part of a frame, as left by a writer that died
+
+
+def _ids(store):
+    return [r['id'] for r in store.iter_records()]
+
+
+def test_append_cuts_torn_frame_of_another_writer(tmp_path):
+    path = str(tmp_path / 'enc.frames')
+    cipher = MultiSubstitutionCipher()
+    a = EncryptedRecordStore(path, cipher)
+    b = EncryptedRecordStore(path, cipher) # another worker, opened before the crash
+    a.append({'id': 'DS1'})
+    with open(path, 'ab') as f:
+        f.write(TORN)
+
+    b.append({'id': 'DS2'})
+    b.append({'id': 'DS3'})
+    assert _ids(b) == ['DS1', 'DS2', 'DS3']
+    size = os.path.getsize(path)
+
+    reopened = EncryptedRecordStore(path, cipher)
+    reopened.append({'id': 'DS4'})
+    assert _ids(reopened) == ['DS1', 'DS2', 'DS3', 'DS4']
+    assert os.path.getsize(path) > size
+
+
+def test_frames_after_an_old_torn_frame_are_kept(tmp_path):
+    # Written by a version that appended after the torn frame
+    path = str(tmp_path / 'enc.frames')
+    cipher = MultiSubstitutionCipher()
+    store = EncryptedRecordStore(path, cipher)
+    with open(path, 'wb') as f:
+        f.write(store._encode({'id': 'DS1'}) + TORN + store._encode({'id': 'DS2'}))
+    size = os.path.getsize(path)
+
+    reopened = EncryptedRecordStore(path, cipher)
+    assert _ids(reopened) == ['DS1', 'DS2']
+    reopened.append({'id': 'DS3'})
+    assert _ids(reopened) == ['DS1', 'DS2', 'DS3']
+    assert os.path.getsize(path) > size
+
+
+def test_jsonl_append_cuts_partial_line_of_another_writer(tmp_path):
+    path = str(tmp_path / 'database.jsonl')
+    a = JSONLRecordStore(path)
+    b = JSONLRecordStore(path)
+    a.append({'id': 'DS1'})
+    with open(path, 'ab') as f:
+        f.write(b'{"id": "DS9", "Nom')
+
+    b.append_many([{'id': 'DS2'}, {'id': 'DS3'}])
+    assert [r['id'] for r in b.iter_records()] == ['DS1', 'DS2', 'DS3']
+    assert [r['id'] for r in JSONLRecordStore(path).iter_records()] == ['DS1', 'DS2', 'DS3']
+
+
+def test_seeded_record_is_not_framed_twice(tmp_path):
+    # The seed copied DS2 while its encryption job was still pending
+    jsonl = JSONLRecordStore(str(tmp_path / 'database.jsonl'))
+    jsonl.append_many([{'id': 'DS1'}, {'id': 'DS2'}])
+    store = EncryptedRecordStore(str(tmp_path / 'enc.frames'), MultiSubstitutionCipher(), seed=jsonl.iter_records)
+    store.append({'id': 'DS2'})
+    store.append({'id': 'DS3'})
+    assert _ids(store) == ['DS1', 'DS2', 'DS3']
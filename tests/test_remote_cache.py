@@ -0,0 +1,75 @@
+"""RemoteCSVCache against a local HTTP stand-in for raw.githubusercontent.com."""
+from remote_cache import RemoteCSVCache
+
+MAIN = '/main/candidatos.csv'
+MASTER = '/master/candidatos.csv'
+
+
+def test_etag_revalidation_then_stale_copy_when_down(csv_server, tmp_path):
+    csv_server.files[MAIN] = 'ID,Edad\nDS01,30\n'
+    cache = RemoteCSVCache(csv_server.url(MAIN), str(tmp_path), ttl=0) # revalidate on every call
+
+    assert cache.get_text() == 'ID,Edad\nDS01,30\n'
+    assert csv_server.requests == [(MAIN, None)]
+    version = cache.version
+
+    # 304: conditional GET with the stored ETag, body and version unchanged
+    assert cache.get_text() == 'ID,Edad\nDS01,30\n'
+    path, etag = csv_server.requests[-1]
+    assert path == MAIN and etag == cache._meta['etag'] and etag
+    assert cache.version == version
+
+    # New body: 200 again, new version, parsed frame refreshed
+    csv_server.files[MAIN] = 'ID,Edad\nDS01,30\nDS02,41\n'
+    assert len(cache.get_dataframe()) == 2
+    assert cache.version == version + 1
+
+    # Connection refused: the stale copy keeps being served
+    csv_server.stop()
+    assert cache.get_text() == 'ID,Edad\nDS01,30\nDS02,41\n'
+    assert list(cache.get_dataframe()['ID']) == ['DS01', 'DS02']
+    assert cache.version == version + 1
+
+
+def test_main_then_master_fallback(csv_server, tmp_path):
+    csv_server.files[MASTER] = 'ID\nDS01\n'
+    cache = RemoteCSVCache(csv_server.url(MAIN), str(tmp_path), ttl=0)
+
+    assert cache.get_text() == 'ID\nDS01\n'
+    assert [path for path, _ in csv_server.requests] == [MAIN, MASTER]
+
+    # The URL that answered is tried first from then on (with its ETag)
+    del csv_server.requests[:]
+    assert cache.get_text() == 'ID\nDS01\n'
+    assert csv_server.requests == [(MASTER, cache._meta['etag'])]
+
+
+def test_fresh_instance_reads_snapshot_while_remote_down(csv_server, tmp_path):
+    csv_server.files[MAIN] = 'ID\nDS01\nDS02\n'
+    url = csv_server.url(MAIN)
+    RemoteCSVCache(url, str(tmp_path), ttl=300).get_text()
+    csv_server.stop()
+
+    # e.g. a worker started after GitHub went away
+    cache = RemoteCSVCache(url, str(tmp_path), ttl=0, timeout=1)
+    assert cache.version == 1
+    assert cache.get_text() == 'ID\nDS01\nDS02\n'
+    assert list(cache.get_dataframe()['ID']) == ['DS01', 'DS02']
+
+
+def test_never_fetched_and_down(csv_server, tmp_path):
+    url = csv_server.url(MAIN)
+    csv_server.stop()
+    cache = RemoteCSVCache(url, str(tmp_path), ttl=0, timeout=1)
+    assert cache.get_text() is None
+    assert cache.get_dataframe() is None
+
+
+def test_cached_text_does_not_revalidate(csv_server, candidatos_text, tmp_path):
+    csv_server.files[MAIN] = candidatos_text
+    cache = RemoteCSVCache(csv_server.url(MAIN), str(tmp_path), ttl=0)
+    assert cache.cached_text() is None
+    assert cache.get_text() == candidatos_text
+    count = len(csv_server.requests)
+    assert cache.cached_text() == candidatos_text
+    assert len(csv_server.requests) == count
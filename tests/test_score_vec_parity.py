@@ -0,0 +1,90 @@
+"""score_*_vec must give exactly what the row-wise reference functions give."""
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import CANDIDATOS_CSV
+from candidate_store import ColumnarCandidateStore
+from model_logic import (
+    prepare_frame, score_titulo, score_certificaciones, score_idiomas,
+    score_titulo_vec, score_certificaciones_vec, score_idiomas_vec,
+)
+
+TITULOS = [
+    'Ph.D. en IA', 'PH.D. EN CIENCIAS', 'Doctorado', 'Maestría en Estadística', 'MAESTRÍA', 'Master of Science',
+    'Lic. en Economía', 'ING. INDUSTRIAL', 'Matemáticas Aplicadas', 'Computación', 'Ciencias de Datos',
+    'Contaduría', 'Biología', '', '  ', 'nan', 'None', None, np.nan, 3.5, 0, True,
+]
+CERTS = [
+    'AWS Certified ML Specialty', 'Google Cloud Data Engineer', 'AZURE', 'gcp', 'Certificado',
+    'Recomendación', 'RECOMENDACIÓN', 'Scrum Master', 'Excel', 'TOEFL', '', None, np.nan, 42, 1.5,
+]
+NIVELES = ['A1', 'a2', 'B1', 'b2', 'C1', 'c2', 'C2 ', 'Nativo', 'B', '', None, np.nan, 1, 0.6]
+
+
+def _cartesian(a, b):
+    return [x for x in a for _ in b], [y for _ in a for y in b]
+
+
+def _expected(fn, *columns):
+    return np.array([fn(*values) for values in zip(*columns)], dtype=float)
+
+
+def _categorical(values):
+    # As the columnar store hands it back: strings, missing = NaN (code -1)
+    return pd.Series([None if v is None or (isinstance(v, float) and np.isnan(v)) else str(v) for v in values],
+                     dtype='category')
+
+
+@pytest.mark.parametrize('categorical', [False, True])
+def test_titulo(categorical):
+    col = _categorical(TITULOS) if categorical else pd.Series(TITULOS, dtype=object)
+    expected = _expected(score_titulo, [None if categorical and x is None else x for x in col.astype(object)])
+    got = score_titulo_vec(pd.DataFrame({'Titulo_Principal': col}))
+    np.testing.assert_array_equal(got.to_numpy(), expected)
+
+
+@pytest.mark.parametrize('categorical', [False, True])
+def test_certificaciones(categorical):
+    c1, c2 = _cartesian(CERTS, CERTS)
+    wrap = _categorical if categorical else (lambda v: pd.Series(v, dtype=object))
+    df = pd.DataFrame({'Certificacion_1': wrap(c1), 'Certificacion_2': wrap(c2)})
+    expected = _expected(score_certificaciones, df['Certificacion_1'].astype(object), df['Certificacion_2'].astype(object))
+    np.testing.assert_array_equal(score_certificaciones_vec(df).to_numpy(), expected)
+
+
+@pytest.mark.parametrize('categorical', [False, True])
+def test_idiomas(categorical):
+    n1, n2 = _cartesian(NIVELES, NIVELES)
+    wrap = _categorical if categorical else (lambda v: pd.Series(v, dtype=object))
+    df = pd.DataFrame({'Nivel_idioma_1': wrap(n1), 'Nivel_idioma_2': wrap(n2)})
+    expected = _expected(score_idiomas, df['Nivel_idioma_1'].astype(object), df['Nivel_idioma_2'].astype(object))
+    np.testing.assert_array_equal(score_idiomas_vec(df).to_numpy(), expected)
+
+
+def _assert_all_scores(df):
+    np.testing.assert_array_equal(score_titulo_vec(df).to_numpy(),
+                                  _expected(score_titulo, df['Titulo_Principal'].astype(object)))
+    np.testing.assert_array_equal(score_certificaciones_vec(df).to_numpy(),
+                                  _expected(score_certificaciones, df['Certificacion_1'].astype(object),
+                                            df['Certificacion_2'].astype(object)))
+    np.testing.assert_array_equal(score_idiomas_vec(df).to_numpy(),
+                                  _expected(score_idiomas, df['Nivel_idioma_1'].astype(object),
+                                            df['Nivel_idioma_2'].astype(object)))
+
+
+def test_candidatos_csv():
+    _assert_all_scores(prepare_frame(pd.read_csv(CANDIDATOS_CSV)))
+
+
+def test_columnar_store(tmp_path):
+    # Categorical columns: evaluated once per category (the _per_row path)
+    raw = pd.read_csv(CANDIDATOS_CSV, dtype=str, keep_default_na=False)
+    store = ColumnarCandidateStore(str(tmp_path / 'store'), list(raw.columns))
+    store.import_csv(CANDIDATOS_CSV)
+    extra = dict(raw.iloc[0])
+    extra.update({'ID': 'DSX', 'Título_Principal': '', 'Certificación_1': 'AWS ML', 'Nivel_idioma_1': 'c2'})
+    store.append_rows([extra])
+    df = prepare_frame(store.read())
+    assert isinstance(df['Titulo_Principal'].dtype, pd.CategoricalDtype)
+    assert df['Titulo_Principal'].isna().any()
+    _assert_all_scores(df)
@@ -0,0 +1,57 @@
+import json
+import os
+import pandas as pd
+import pytest
+from conftest import ROOT
+from model_logic import DEFAULT_PROFILE_CONFIG, WEIGHTS, LEVEL_MAP, score_certificaciones_vec, score_titulo_vec
+from scoring_profiles import resolve_profiles, load_profiles, compile_profile
+
+
+def test_partial_weights_keep_inherited_ones():
+    raw = {
+        'ml': {'weights': {'Python_Pct': 0.35, 'R_Pct': 0.0}},
+        'senior': {'extends': 'ml', 'weights': {'SQL_Pct': 0.3}, 'level_map': {'c2': 0.9}},
+    }
+    resolved = resolve_profiles(raw, DEFAULT_PROFILE_CONFIG)
+
+    assert resolved['ml']['weights'] == dict(WEIGHTS, Python_Pct=0.35, R_Pct=0.0)
+    assert list(resolved['ml']['weights']) == list(WEIGHTS) # summed in the default order
+    assert resolved['senior']['weights'] == dict(WEIGHTS, Python_Pct=0.35, R_Pct=0.0, SQL_Pct=0.3)
+    assert resolved['senior']['level_map'] == dict(LEVEL_MAP, c2=0.9)
+    # The parents are not modified
+    assert DEFAULT_PROFILE_CONFIG['weights'] == WEIGHTS
+    assert resolved['ml']['level_map'] == LEVEL_MAP
+
+
+def test_other_keys_replace_inherited_value():
+    raw = {'short': {'cert_keywords': ['aws']}}
+    assert resolve_profiles(raw, DEFAULT_PROFILE_CONFIG)['short']['cert_keywords'] == ['aws']
+
+
+def test_unknown_weight_is_rejected(tmp_path):
+    path = tmp_path / 'profiles.json'
+    path.write_text(json.dumps({'typo': {'weights': {'Pyton_Pct': 0.3}}}), encoding='utf-8')
+    with pytest.raises(ValueError, match='unknown features'):
+        load_profiles(str(path), DEFAULT_PROFILE_CONFIG)
+
+
+def test_shipped_profiles_are_unchanged():
+    path = os.path.join(ROOT, 'scoring_profiles.json')
+    with open(path, 'r', encoding='utf-8') as f:
+        raw = json.load(f)
+    profiles = load_profiles(path, DEFAULT_PROFILE_CONFIG)
+    assert profiles['ml_engineer'].config['weights'] == raw['ml_engineer']['weights']
+    assert profiles['senior_ml_engineer'].config['weights'] == raw['ml_engineer']['weights']
+    assert profiles['data_analyst'].config['weights'] == raw['data_analyst']['weights']
+
+
+
+def test_empty_keyword_lists_match_nothing():
+    config = dict(DEFAULT_PROFILE_CONFIG, cert_keywords=[],
+                  titulo_tiers=[{'keywords': [], 'score': 1.0}] + DEFAULT_PROFILE_CONFIG['titulo_tiers'])
+    profile = compile_profile(config, 'empty_keywords')
+    df = pd.DataFrame({'Certificacion_1': ['Excel', ''], 'Certificacion_2': ['AWS ML', None],
+                       'Titulo_Principal': ['Ing. en Sistemas', 'Arte']})
+
+    assert list(score_certificaciones_vec(df, profile=profile)) == [0.0, 0.0]
+    assert list(score_titulo_vec(df, profile=profile)) == [0.6, 0.3] # the empty tier is skipped
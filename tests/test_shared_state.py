@@ -0,0 +1,117 @@
+import csv
+import io
+import os
+import sqlite3
+import pytest
+from conftest import ROOT
+from remote_cache import RemoteCSVCache
+from model_logic import ScoringEngine, load_scoring_profiles
+from shared_state import SharedScoreState, SCHEMA_VERSION
+
+
+def _rows(candidatos_text):
+    return list(csv.DictReader(io.StringIO(candidatos_text)))
+
+
+def _append_local(path, rows):
+    # What persist_candidates does before add_candidates
+    new = not path.exists()
+    with open(path, 'a', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        if new:
+            writer.writeheader()
+        writer.writerows(rows)
+
+
+def _engine(csv_server, tmp_path, shared):
+    cache = RemoteCSVCache(csv_server.url('/main/candidatos.csv'), str(tmp_path / 'cache'), ttl=3600)
+    return ScoringEngine(str(tmp_path / 'new_candidates.csv'), remote_cache=cache, shared=shared)
+
+
+def test_workers_agree_on_scores_and_population(csv_server, candidatos_text, tmp_path):
+    csv_server.files['/main/candidatos.csv'] = candidatos_text
+    template = _rows(candidatos_text)
+    _append_local(tmp_path / 'new_candidates.csv', [dict(template[0], ID='DS1')])
+    path = str(tmp_path / 'scores.sqlite3')
+    a = _engine(csv_server, tmp_path, SharedScoreState(path))
+    b = _engine(csv_server, tmp_path, SharedScoreState(path))
+    a.snapshot()
+    b.snapshot()
+
+    # A new candidate and a re-submitted one (DS1 with other bias fields)
+    added = [dict(template[1], ID='DS2'), dict(template[2], ID='DS1')]
+    _append_local(tmp_path / 'new_candidates.csv', added)
+    a.add_candidates(added)
+
+    snap = b.snapshot()
+    fresh = _engine(csv_server, tmp_path, None)
+    fresh.load()
+    assert 'DS2' in snap.ranks
+    assert {i: r['Score_Final'] for i, r in b._candidates.items()} == \
+        {i: r['Score_Final'] for i, r in fresh._candidates.items()}
+    assert b._bias.population == fresh._bias.population
+
+
+def test_older_layout_is_discarded(tmp_path):
+    path = str(tmp_path / 'scores.sqlite3')
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE state (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+    conn.execute('CREATE TABLE candidates (id TEXT PRIMARY KEY, seq INTEGER NOT NULL UNIQUE, '
+                 'rank_key REAL NOT NULL, record TEXT NOT NULL)')
+    conn.execute('CREATE TABLE bias_counts (col TEXT NOT NULL, category TEXT NOT NULL, count INTEGER NOT NULL)')
+    conn.execute("INSERT INTO state VALUES ('generation', '3')")
+    conn.commit()
+    conn.close()
+
+    shared = SharedScoreState(path)
+    assert shared.state()['generation'] == 0 # rescored by the first worker
+    shared.replace([{'ID': 'DS1', 'Score_Final': 0.5}], ['ID', 'Score_Final'], {'v': 1})
+    assert shared.changes_since(0)[1] == [(1, {'ID': 'DS1', 'Score_Final': 0.5})]
+    shared.close()
+
+    conn = sqlite3.connect(path)
+    tables = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert tables == {'state', 'candidates'}
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION
+    conn.close()
+
+
+@pytest.mark.parametrize('name', ['ml_engineer', 'senior_ml_engineer']) # re-weighted / re-scored
+def test_other_workers_adopt_set_profile(csv_server, candidatos_text, tmp_path, name):
+    csv_server.files['/main/candidatos.csv'] = candidatos_text
+    template = _rows(candidatos_text)
+    _append_local(tmp_path / 'new_candidates.csv', [dict(template[0], ID='DS1')])
+    profile = load_scoring_profiles(os.path.join(ROOT, 'scoring_profiles.json'))[name]
+    path = str(tmp_path / 'scores.sqlite3')
+    a = _engine(csv_server, tmp_path, SharedScoreState(path))
+    b = _engine(csv_server, tmp_path, SharedScoreState(path))
+    a.snapshot()
+    b.snapshot()
+
+    a.set_profile(profile)
+    snap = b.snapshot()
+    assert b.profile.hash == profile.hash
+    added = [dict(template[1], ID='DS2')]
+    _append_local(tmp_path / 'new_candidates.csv', added)
+    b.add_candidates(added) # scored with the adopted profile
+
+    fresh = ScoringEngine(str(tmp_path / 'new_candidates.csv'), remote_cache=a.source.remote_cache, profile=profile)
+    fresh.load()
+    expected = {i: r['Score_Final'] for i, r in fresh._candidates.items()}
+    assert snap.ranked[0][2] == max(v for i, v in expected.items() if i != 'DS2')
+    for engine in (a, b):
+        engine.snapshot()
+        assert {i: r['Score_Final'] for i, r in engine._candidates.items()} == expected
+    # A worker started later scores with it too, instead of republishing the default
+    c = _engine(csv_server, tmp_path, SharedScoreState(path))
+    c.snapshot()
+    assert c.profile.hash == profile.hash
+    assert a.shared.state()['generation'] == 2
+
+
+def test_upsert_refuses_records_of_another_profile(tmp_path):
+    shared = SharedScoreState(str(tmp_path / 'scores.sqlite3'))
+    shared.replace([{'ID': 'DS1', 'Score_Final': 0.5}], ['ID', 'Score_Final'], {'profile': 'p2'})
+    assert shared.upsert([{'ID': 'DS2', 'Score_Final': 0.4}], profile='p1') is False
+    assert shared.upsert([{'ID': 'DS2', 'Score_Final': 0.4}], profile='p2') is True
+    assert [r['ID'] for _, r in shared.changes_since(0)[1]] == ['DS1', 'DS2']
@@ -0,0 +1,25 @@
+import os
+import sys
+import json
+import subprocess
+from conftest import ROOT
+
+PROBE = """
+import json, app
+client = app.app.test_client()
+responses = [
+    client.post('/submit_batch'),
+    client.post('/submit_batch', data='null', content_type='application/json'),
+    client.post('/submit_batch', data='not json', content_type='application/json'),
+    client.post('/submit_batch', json={'candidates': None}),
+    client.post('/submit_batch', json=7),
+]
+print(json.dumps([[r.status_code, r.get_json()['message']] for r in responses]))
+"""
+
+
+def test_empty_requests_are_rejected(tmp_path):
+    env = dict(os.environ, RECRUITMENT_DATA_DIR=str(tmp_path), SHARED_STATE_PATH='')
+    out = subprocess.run([sys.executable, '-c', PROBE], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    assert result == [[400, "No candidates in request."]] * 5
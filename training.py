@@ -0,0 +1,248 @@
+"""
+Availability-prediction CNN, trained outside the request path.
+
+    python training.py [--epochs 30]
+
+trains on the combined dataset (remote + local), and writes a new version to
+models/<version>/ (model.keras, scaler.pkl, meta.json). Then it points
+models/LATEST at it. The web process only loads whatever LATEST names
+(ModelRegistry), so a retrain is picked up without restarting workers and
+nothing is trained per request. Training always runs on CPU.
+"""
+import os
+import json
+import time
+import pickle
+import argparse
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from model_logic import RecruitmentAI, RENAME_MAP
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(BASE_DIR, 'models')
+
+# Target Mapping (Disponibilidad_contratación -> class)
+DC_MAPPING = {
+    '6 meses': 0, '1 mes': 20, '4 semanas': 40,
+    '3 semanas': 60, '2 semanas': 80, 'Inmediata': 100
+}
+
+NUMERICAL_FEATURES = [
+    'Anios_de_experiencia', 'Python_Pct', 'R_Pct', 'SQL_Pct',
+    'Estadistica_Avanzada_Pct', 'Salario_Medio_MXN'
+]
+CATEGORICAL_FEATURES = ['Disponibilidad_de_viajar']
+
+
+def _import_keras():
+    # Must happen before TensorFlow initialises: never grab a GPU
+    os.environ['CUDA_VISIBLE_DEVICES'] = '-1'
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+    import tensorflow as tf
+    tf.config.set_visible_devices([], 'GPU')
+    return tf.keras
+
+
+def encode_features(df, feature_cols=None):
+    """
+    Raw candidate rows (CSV headers) -> numeric feature frame.
+    With `feature_cols` the one-hot columns are aligned to a trained model.
+    """
+    df = df.rename(columns=RENAME_MAP)
+    # Expectativas salariales
+    df['Salario_Medio_MXN'] = pd.to_numeric(df['Sueldo_mensual'], errors='coerce').fillna(0)
+    for col in NUMERICAL_FEATURES:
+        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+    df_encoded = pd.get_dummies(df, columns=CATEGORICAL_FEATURES, drop_first=feature_cols is None)
+    if feature_cols is None:
+        feature_cols = NUMERICAL_FEATURES + [col for col in df_encoded.columns if any(col.startswith(cat + '_') for cat in CATEGORICAL_FEATURES)]
+    return df_encoded.reindex(columns=feature_cols, fill_value=0).astype(float), feature_cols
+
+
+def prepare_training_data(df):
+    """X, y, feature columns and class labels for the CNN."""
+    # Strip whitespace from CSV data ('Inmediata ' has a trailing space)
+    target = df['Disponibilidad_contratación'].astype(str).str.strip().map(DC_MAPPING)
+    # Only rows with a known availability are used for training
+    df = df[target.notna()]
+    target = target[target.notna()]
+    classes = sorted(target.unique())
+    class_to_idx = {cls: idx for idx, cls in enumerate(classes)}
+    X, feature_cols = encode_features(df)
+    y = target.map(class_to_idx).to_numpy(dtype=int)
+    return X.to_numpy(), y, feature_cols, [int(c) for c in classes]
+
+
+def build_model(keras, num_features, num_classes):
+    model = keras.Sequential([
+        keras.Input(shape=(num_features, 1)),
+        keras.layers.Conv1D(32, kernel_size=min(3, num_features), activation='relu'),
+        keras.layers.Dropout(0.2),
+        keras.layers.Flatten(),
+        keras.layers.Dense(32, activation='relu'),
+        keras.layers.Dense(num_classes, activation='softmax'),
+    ])
+    model.compile(optimizer='adam', loss='categorical_crossentropy', metrics=['accuracy'])
+    return model
+
+
+def _write_atomic(path, content):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp, path)
+
+
+def train_model(local_path, remote_url=None, model_dir=MODEL_DIR, epochs=30, batch_size=16, seed=42):
+    """Trains, evaluates and publishes a new model version. Returns its meta dict."""
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.metrics import recall_score
+    keras = _import_keras()
+    keras.utils.set_random_seed(seed)
+
+    df = RecruitmentAI(local_path, remote_url=remote_url).load_combined_data()
+    if df.empty:
+        raise ValueError("No data found (Local or Remote).")
+    X, y, feature_cols, classes = prepare_training_data(df)
+    if len(classes) < 2:
+        raise ValueError("Need at least two availability classes to train.")
+
+    # Stratify when every class has at least two rows
+    stratify = y if np.bincount(y).min() >= 2 else None
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=seed, stratify=stratify)
+
+    # SCALING (fitted on the training split only)
+    scaler = StandardScaler()
+    X_train = scaler.fit_transform(X_train)
+    X_test = scaler.transform(X_test)
+
+    model = build_model(keras, X.shape[1], len(classes))
+    model.fit(X_train[..., np.newaxis], keras.utils.to_categorical(y_train, len(classes)),
+              epochs=epochs, batch_size=batch_size, verbose=0)
+    y_pred = model.predict(X_test[..., np.newaxis], verbose=0).argmax(axis=1)
+
+    version = time.strftime('%Y%m%d-%H%M%S') + f"-{os.getpid()}"
+    version_dir = os.path.join(model_dir, version)
+    os.makedirs(version_dir, exist_ok=True)
+    model.save(os.path.join(version_dir, 'model.keras'))
+    with open(os.path.join(version_dir, 'scaler.pkl'), 'wb') as f:
+        pickle.dump(scaler, f)
+    meta = {
+        'version': version,
+        'trained_at': time.time(),
+        'rows': int(len(y)),
+        'feature_cols': feature_cols,
+        'classes': classes,
+        'recall_macro': float(recall_score(y_test, y_pred, average='macro', zero_division=0)),
+    }
+    _write_atomic(os.path.join(version_dir, 'meta.json'), json.dumps(meta, indent=2))
+    # Publish: workers switch on their next ModelRegistry.current() call
+    _write_atomic(os.path.join(model_dir, 'LATEST'), version)
+    return meta
+
+
+class TrainingJob:
+    """
+    Runs train_model in a separate (spawned) process so the web worker never
+    imports TensorFlow for training nor blocks on it. One job at a time.
+    """
+
+    def __init__(self, local_path, remote_url=None, model_dir=MODEL_DIR):
+        self.local_path = local_path
+        self.remote_url = remote_url
+        self.model_dir = model_dir
+        self._lock = threading.Lock()
+        self._executor = None
+        self._future = None
+
+    def start(self, **kwargs):
+        """Starts a training run unless one is already running. Returns True if started."""
+        with self._lock:
+            if self._future is not None and not self._future.done():
+                return False
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'))
+            self._future = self._executor.submit(train_model, self.local_path, self.remote_url, self.model_dir, **kwargs)
+            return True
+
+    def status(self):
+        with self._lock:
+            future = self._future
+        if future is None:
+            return {"state": "idle"}
+        if not future.done():
+            return {"state": "running"}
+        if future.exception() is not None:
+            return {"state": "failed", "error": str(future.exception())}
+        return {"state": "finished", "model": future.result()}
+
+
+class ModelRegistry:
+    """
+    Serves predictions from the version named in models/LATEST, reloading
+    (hot-swapping) only when that pointer changes.
+    """
+
+    def __init__(self, model_dir=MODEL_DIR):
+        self.model_dir = model_dir
+        self.latest_path = os.path.join(model_dir, 'LATEST')
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._loaded = None # (meta, model, scaler)
+
+    def _latest_version(self):
+        try:
+            st = os.stat(self.latest_path)
+        except FileNotFoundError:
+            return None, None
+        stamp = (st.st_mtime_ns, st.st_size)
+        if stamp == self._stamp:
+            return stamp, None
+        with open(self.latest_path, 'r', encoding='utf-8') as f:
+            return stamp, f.read().strip()
+
+    def current(self):
+        """(meta, model, scaler) of the latest published version, or None."""
+        with self._lock:
+            stamp, version = self._latest_version()
+            if stamp is None or version is None:
+                return self._loaded
+            if self._loaded is None or self._loaded[0]['version'] != version:
+                version_dir = os.path.join(self.model_dir, version)
+                keras = _import_keras()
+                with open(os.path.join(version_dir, 'meta.json'), 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                with open(os.path.join(version_dir, 'scaler.pkl'), 'rb') as f:
+                    scaler = pickle.load(f)
+                model = keras.models.load_model(os.path.join(version_dir, 'model.keras'))
+                self._loaded = (meta, model, scaler)
+            self._stamp = stamp
+            return self._loaded
+
+    def predict_availability(self, rows):
+        """
+        Predicted Disponibilidad_contratación class (0 = 6 meses ... 100 =
+        Inmediata) for raw rows keyed by CSV headers. None if no model yet.
+        """
+        loaded = self.current()
+        if loaded is None:
+            return None
+        meta, model, scaler = loaded
+        X, _ = encode_features(pd.DataFrame(rows), meta['feature_cols'])
+        X_scaled = scaler.transform(X.to_numpy())
+        pred = model.predict(X_scaled[..., np.newaxis], verbose=0).argmax(axis=1)
+        return [meta['classes'][i] for i in pred]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Train the availability CNN on CPU and publish a new version.")
+    parser.add_argument('--local', default=os.path.join(BASE_DIR, 'data', 'new_candidates.csv'))
+    parser.add_argument('--remote', default="https://raw.githubusercontent.com/allmore0/min_sesgos/main/candidatos.csv")
+    parser.add_argument('--model-dir', default=MODEL_DIR)
+    parser.add_argument('--epochs', type=int, default=30)
+    args = parser.parse_args()
+    print(json.dumps(train_model(args.local, args.remote or None, args.model_dir, epochs=args.epochs), indent=2))